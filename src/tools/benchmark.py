@@ -0,0 +1,354 @@
+import argparse
+import glob
+import heapq
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from ..upmevo import annealing, batch, evaluation, genetic, localsearch, tabusearch
+from ..upmproblems.generator import random_instance
+from ..upmproblems.psplib import read_psplib
+from ..upmproblems.schedule import get_makespan
+from ..upmsearch import bounds, search_exercises
+from ..upmsearch.astar import rcpsp_a_star
+from ..upmsearch.branchandbound import build_problem, rcpsp_branch_and_bound
+
+# Version of the layout of the baseline file
+baseline_version = 3
+# Sizes of the generated instances, and their seed
+generated_sizes = (30, 60, 120)
+generated_seed = 0
+# Nodes taken out of the queue after which the exact searches are stopped, they keep the best schedule found
+search_node_limit = 100
+# Evaluations of the tabu search and the simulated annealing in every run
+local_search_evaluations = 2000
+# Rounds of timed runs of every case, each one does the same runs
+rounds = 5
+# Share of the relative throughput of the baseline that a case can lose before it counts as a regression
+default_threshold = 0.2
+# Times a case that regresses is measured again, it only counts as a regression if every measure does
+retries = 2
+
+
+def reference_workload():
+    # Fixed work that does not use the solvers, timed next to every round to measure the speed of the machine at the
+    # time: heap operations, dictionary updates and list copies, as in the solvers
+    heap = []
+    counts = {}
+    for i in range(20000):
+        heapq.heappush(heap, i * 7919 % 10007)
+        counts[i % 97] = counts.get(i % 97, 0) + 1
+    while heap:
+        heapq.heappop(heap)
+    rows = [list(range(30)) for _ in range(300)]
+    return sum(map(sum, rows)) + len(counts)
+
+
+def time_reference():
+    start = time.perf_counter()
+    reference_workload()
+    return time.perf_counter() - start
+
+
+class NodeLimit:
+    """
+    Stop event of the searches that is set once they checked it more than limit times. They check it before taking
+    every node out of the queue, so a run does the same work however fast the machine is.
+    """
+    def __init__(self, limit):
+        self.limit = limit
+        self.checks = 0
+
+    def is_set(self):
+        self.checks += 1
+        return self.checks > self.limit
+
+
+def run_search(instance, seed, lower_bound, search, propagation=False):
+    stats = {}
+    best_schedule = search(*build_problem(*instance[1:]), stats=stats, propagation=propagation,
+                           stop=NodeLimit(search_node_limit))
+    return best_schedule.start_times if best_schedule is not None else None, stats['nodes_expanded']
+
+
+def run_state_search(instance, seed, lower_bound, search):
+    # Searches of search_exercises, over the states of a search_exercises.Problem
+    stats = {}
+    state = search(search_exercises.ProblemState(search_exercises.Problem(*instance)), stats,
+                   stop=NodeLimit(search_node_limit))
+    return state.start_times if state is not None else None, stats['expanded']
+
+
+def run_genetic(instance, seed, lower_bound, advanced=False, encoding='permutation', **options):
+    engine = genetic.GeneticEngine(instance, seed, encoding=encoding)
+    engine.cache['lower_bound'] = lower_bound  # Computed once per instance, outside the measured time
+    evaluator = evaluation.SerialEvaluator(engine)
+    best_schedule, _ = engine.run(advanced, evaluator, **options)
+    return engine.get_start_times(best_schedule), evaluator.evaluations
+
+
+def run_local_search(instance, seed, lower_bound, search):
+    engine = genetic.GeneticEngine(instance, seed)
+    engine.cache['lower_bound'] = lower_bound
+    budget = localsearch.Budget(local_search_evaluations)
+    best_order, _ = search(engine, budget)
+    return engine.get_start_times(best_order), budget.evaluations
+
+
+# Function and options of every solver. The function receives the instance, the seed, the lower bound of the
+# instance (None with several resource types) and the options, and returns the start times of the schedule found
+# (None if none) and the work done: nodes expanded by the searches, schedules evaluated by the others. The work of a
+# run only depends on its seed: the searches stop after a number of nodes, and the other solvers after a number of
+# evaluations or when they reach the lower bound, which is computed with a fixed number of probes.
+solvers = {
+    'branch_and_bound': (run_search, dict(search=rcpsp_branch_and_bound)),
+    'branch_and_bound_propagation': (run_search, dict(search=rcpsp_branch_and_bound, propagation=True)),
+    'a_star': (run_search, dict(search=rcpsp_a_star)),
+    'a_star_propagation': (run_search, dict(search=rcpsp_a_star, propagation=True)),
+    'exercise_branch_and_bound': (run_state_search, dict(search=search_exercises.branch_and_bound)),
+    'exercise_a_star': (run_state_search, dict(search=search_exercises.a_star)),
+    'genetic': (run_genetic, {}),
+    'advanced_genetic': (run_genetic, dict(advanced=True, encoding='activity_list')),
+    'steady_state': (run_genetic, dict(advanced=True, encoding='activity_list', steady_state=True)),
+    'vectorized': (run_genetic, dict(advanced=True, encoding='random_key', vectorized=True)),
+    'tabu': (run_local_search, dict(search=tabusearch.tabu_search)),
+    'annealing': (run_local_search, dict(search=annealing.simulated_annealing)),
+}
+# Solvers that handle several resource types, the others need a single resource
+multi_resource_solvers = ('branch_and_bound', 'branch_and_bound_propagation', 'a_star', 'a_star_propagation')
+
+
+def default_instances(psplib_paths=()):
+    """
+    Instances of the benchmark: the ones of the assignment, generated ones of every size in generated_sizes and the
+    PSPLIB files given
+    :param psplib_paths: paths of .sm files, or of directories whose .sm files are read
+    :return: dictionary with the instance (tuple of its parameters) of every instance name
+    """
+    instances = batch.default_instances()
+    for size in generated_sizes:
+        instances[f'generated{size}'] = random_instance(size, generated_seed)
+    for path in psplib_paths:
+        files = sorted(glob.glob(os.path.join(path, '*.sm'))) if os.path.isdir(path) else [path]
+        for file in files:
+            instances[os.path.splitext(os.path.basename(file))[0]] = read_psplib(file)
+    return instances
+
+
+def measure(solver, instance, lower_bound, min_time=0.5, runs=None):
+    """
+    Measures a solver, named in solvers, on an instance. The peak memory is taken in a first run traced by
+    tracemalloc. The time and the throughput come from rounds of untraced runs with the seeds 0, 1, 2...: unless the
+    number of runs is given, the first round goes on until it takes its share of min_time, and every other round
+    repeats the same runs. Each round is timed with its own work, the throughput of the case is the one of the
+    fastest round. The reference workload is timed before and after every round, and the relative throughput, the
+    work done by the fastest round in the shortest time of the reference workload, does not depend on how fast the
+    machine was while the case ran. The schedules of the first round are validated together once it ends.
+    :param runs: number of runs of every round, e.g. the one of the baseline so that both measure the same work
+    :return: dictionary with the number of runs of a round, the work of a round, the mean time of a run and the work
+             done per second in the fastest round, the throughput of every round and their relative spread, the
+             shortest time of the reference workload, the relative throughput, the peak memory in bytes, the best
+             and mean makespan and the number of infeasible schedules (None when numpy, which the validation needs,
+             is not installed)
+    """
+    function, options = solvers[solver]
+    tracemalloc.start()
+    try:
+        function(instance, 0, lower_bound, **options)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    references = [time_reference()]
+    schedules = []
+    work = 0
+    elapsed = 0.0
+    seed = 0
+    while (seed < runs) if runs is not None else (elapsed < min_time / rounds):
+        start = time.perf_counter()
+        start_times, run_work = function(instance, seed, lower_bound, **options)
+        elapsed += time.perf_counter() - start
+        work += run_work
+        if start_times is not None:
+            schedules.append(start_times)
+        seed += 1
+    runs = seed
+    references.append(time_reference())
+    measures = [(work, elapsed)]
+    for _ in range(rounds - 1):
+        work = 0
+        start = time.perf_counter()
+        for seed in range(runs):
+            work += function(instance, seed, lower_bound, **options)[1]
+        measures.append((work, time.perf_counter() - start))
+        references.append(time_reference())
+    throughputs = [work / elapsed for work, elapsed in measures]
+    fastest = max(range(rounds), key=throughputs.__getitem__)
+
+    makespans = [get_makespan(start_times, instance[2]) for start_times in schedules]
+    infeasible = None
+    if batch.numpy_available():
+        from ..upmproblems import validation  # numpy is only needed to validate the schedules
+        infeasible = sum(bool(violations) for violations in validation.validate_schedules(*instance, schedules))
+    return dict(runs=runs, work=measures[0][0], time=measures[fastest][1] / runs, throughput=throughputs[fastest],
+                throughputs=throughputs, spread=(max(throughputs) - min(throughputs)) / (max(throughputs) or 1),
+                reference=min(references), relative_throughput=throughputs[fastest] * min(references),
+                peak_memory=peak_memory,
+                best_makespan=min(makespans, default=None),
+                mean_makespan=sum(makespans) / len(makespans) if makespans else None, infeasible=infeasible)
+
+
+def run_benchmark(instances, solver_names=tuple(solvers), min_time=0.5, callback=None, baseline=None,
+                  threshold=default_threshold):
+    """
+    Measures every solver on every instance it can solve
+    :param instances: dictionary with the instance (tuple of its parameters) of every instance name
+    :param solver_names: names of the solvers measured, from solvers
+    :param min_time: minimum time in seconds of the timed rounds of every case
+    :param callback: optional function called with the name and the measures of every case
+    :param baseline: optional results of an earlier benchmark, its cases are measured with the same runs. A case
+                     that regresses against it is measured again, up to retries times, and keeps the fastest
+                     measure, so a regression has to show up in every measure.
+    :param threshold: share of the relative throughput of the baseline that a case can lose
+    :return: dictionary with the environment and the measures of every case, named instance/solver, which also
+             hold the lower bound of the instance
+    """
+    for name in solver_names:
+        if name not in solvers:
+            raise ValueError(f"Unknown solver {name!r}, expected one of {tuple(solvers)}")
+    cases = {}
+    for instance_name, instance in instances.items():
+        single_resource = isinstance(instance[1], int)
+        lower_bound = bounds.lower_bound(*instance) if single_resource else None
+        for solver_name in solver_names:
+            if not single_resource and solver_name not in multi_resource_solvers:
+                continue
+            if solver_name == 'vectorized' and not batch.numpy_available():
+                continue
+            name = f'{instance_name}/{solver_name}'
+            old = baseline['cases'].get(name) if baseline is not None else None
+            case = measure(solver_name, instance, lower_bound, min_time, old['runs'] if old is not None else None)
+            for _ in range(retries):
+                if old is None or not is_regression(case, old, threshold):
+                    break
+                retry = measure(solver_name, instance, lower_bound, min_time, old['runs'])
+                case = max(case, retry, key=lambda measures: measures['relative_throughput'])
+            case['lower_bound'] = lower_bound
+            cases[name] = case
+            if callback is not None:
+                callback(name, case)
+    return dict(version=baseline_version, python=platform.python_version(), machine=platform.machine(),
+                processor=platform.processor(), cases=cases)
+
+
+def load_baseline(path):
+    with open(path) as file:
+        baseline = json.load(file)
+    if baseline.get('version') != baseline_version:
+        raise ValueError(f"Baseline {path!r} has version {baseline.get('version')}, expected {baseline_version}")
+    return baseline
+
+
+def save_baseline(results, path):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def compare(results, baseline, threshold=default_threshold):
+    """
+    Compares the measures of a run with the ones of a baseline, case by case: a case regresses when the relative
+    throughput of its fastest round is lower than the one of the baseline by more than the threshold. The cases that do no work in either run (a local search that starts from an optimal schedule) are
+    left out.
+    :param threshold: share of the relative throughput of the baseline that a case can lose
+    :return: tuple with the list of the names of the cases whose throughput regressed and a dictionary with the
+             relative change of the relative throughput, the speed of the machine, the peak memory and the best
+             makespan of every case compared
+    """
+    regressions = []
+    changes = {}
+    for name, case in results['cases'].items():
+        old = baseline['cases'].get(name)
+        if old is None or not case['work'] or not old['work']:
+            continue
+        changes[name] = dict(
+            throughput=relative_change(case['relative_throughput'], old['relative_throughput']),
+            speed=relative_change(old['reference'], case['reference']),
+            peak_memory=relative_change(case['peak_memory'], old['peak_memory']),
+            best_makespan=relative_change(case['best_makespan'], old['best_makespan']),
+        )
+        if is_regression(case, old, threshold):
+            regressions.append(name)
+    return regressions, changes
+
+
+# Whether a case lost more than the threshold of the relative throughput of its baseline, the cases without work
+# in either run never do
+def is_regression(case, old, threshold):
+    if not case['work'] or not old['work']:
+        return False
+    return case['relative_throughput'] < (1 - threshold) * old['relative_throughput']
+
+
+def relative_change(new, old):
+    if new is None or old is None or old == 0:
+        return None
+    return (new - old) / old
+
+
+def format_case(name, case):
+    makespan = '-' if case['best_makespan'] is None else case['best_makespan']
+    lower_bound = '-' if case['lower_bound'] is None else case['lower_bound']
+    return (f"{name:<45} {case['runs']:>4} {case['time']:>8.4f} {case['throughput']:>11.1f} {case['spread']:>6.1%} "
+            f"{case['peak_memory'] / 1024:>9.0f} {makespan:>6} {lower_bound:>6}")
+
+
+def format_changes(changes, regressions):
+    lines = [f"{'case':<45} {'throughput':>10} {'speed':>8} {'memory':>8} {'makespan':>8}"]
+    for name, change in changes.items():
+        values = ['-' if change[key] is None else f'{change[key]:+.1%}'
+                  for key in ('throughput', 'speed', 'peak_memory', 'best_makespan')]
+        lines.append(f"{name:<45} {values[0]:>10} {values[1]:>8} {values[2]:>8} {values[3]:>8}"
+                     + ('  REGRESSION' if name in regressions else ''))
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the solvers of upmsearch and upmevo")
+    parser.add_argument('--baseline', default='benchmark_baseline.json', help="JSON file of the baseline")
+    parser.add_argument('--save', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=default_threshold,
+                        help="share of the relative throughput a case can lose before the run fails")
+    parser.add_argument('--min-time', type=float, default=0.5, help="minimum seconds of timed rounds per case")
+    parser.add_argument('--solvers', nargs='+', default=list(solvers), choices=list(solvers))
+    parser.add_argument('--psplib', nargs='*', default=[], help=".sm files or directories of PSPLIB instances")
+    arguments = parser.parse_args()
+
+    baseline = None
+    if not arguments.save and os.path.exists(arguments.baseline):
+        baseline = load_baseline(arguments.baseline)
+    print(f"{'case':<45} {'runs':>4} {'time':>8} {'throughput':>11} {'spread':>6} {'memory KB':>9} {'best':>6} "
+          f"{'bound':>6}")
+    results = run_benchmark(default_instances(arguments.psplib), arguments.solvers, arguments.min_time,
+                            lambda name, case: print(format_case(name, case), flush=True), baseline,
+                            arguments.threshold)
+    infeasible = [name for name, case in results['cases'].items() if case['infeasible']]
+    if infeasible:
+        print(f"Infeasible schedules found by {', '.join(infeasible)}")
+    regressions = []
+    if baseline is None:
+        save_baseline(results, arguments.baseline)
+        print(f"Baseline saved to {arguments.baseline}")
+    else:
+        regressions, changes = compare(results, baseline, arguments.threshold)
+        print(format_changes(changes, regressions))
+        idle = [name for name in results['cases'] if name in baseline['cases'] and name not in changes]
+        if idle:
+            print(f"Left out, no work in either run: {', '.join(idle)}")
+        if regressions:
+            print(f"{len(regressions)} cases lost more than {arguments.threshold:.0%} of their throughput")
+    if infeasible or regressions:
+        sys.exit(1)
@@ -0,0 +1,114 @@
+from ..upmproblems.schedule import get_makespan, get_predecessors, get_successors, get_tails
+from . import genetic
+
+
+# Predecessors and successors (0-indexed) of the instance of the engine, computed once per instance
+def get_precedence(engine):
+    if 'precedence' not in engine.cache:
+        engine.cache['precedence'] = (get_predecessors(engine.tasks, engine.task_dependencies),
+                                      get_successors(engine.tasks, engine.task_dependencies))
+    return engine.cache['precedence']
+
+
+# Random activity list: every task (1-indexed) is taken at random among the ones whose predecessors are all listed
+def random_activity_list(engine):
+    predecessors, successors = get_precedence(engine)
+    pending = [len(predecessors[task]) for task in range(engine.tasks)]
+    eligible = [task for task in range(engine.tasks) if pending[task] == 0]
+    activity_list = []
+    rng = engine.rng
+    while eligible:
+        task = eligible.pop(rng.randrange(len(eligible)))
+        activity_list.append(task + 1)
+        for suc in successors[task]:
+            pending[suc] -= 1
+            if pending[suc] == 0:
+                eligible.append(suc)
+    if len(activity_list) < engine.tasks:
+        raise ValueError("The task dependencies contain a cycle")
+    return activity_list
+
+
+# Activity list that always takes the eligible task with the longest chain of successors
+def longest_tail_activity_list(engine):
+    predecessors, successors = get_precedence(engine)
+    tails = get_tails(engine.tasks, engine.task_duration, engine.task_dependencies)
+    pending = [len(predecessors[task]) for task in range(engine.tasks)]
+    eligible = [task for task in range(engine.tasks) if pending[task] == 0]
+    activity_list = []
+    while eligible:
+        task = max(eligible, key=lambda task: (tails[task], -task))
+        eligible.remove(task)
+        activity_list.append(task + 1)
+        for suc in successors[task]:
+            pending[suc] -= 1
+            if pending[suc] == 0:
+                eligible.append(suc)
+    if len(activity_list) < engine.tasks:
+        raise ValueError("The task dependencies contain a cycle")
+    return activity_list
+
+
+# Initialize a population of activity lists that respect the task dependencies
+def initialize_population(engine, population_size):
+    return [random_activity_list(engine) for _ in range(population_size)]
+
+
+# Hartmann's one-point crossover: each child keeps the head of one parent and lists the remaining tasks in the
+# order of the other parent, so both children respect the dependencies
+def one_point_crossover(engine, parent1, parent2):
+    if engine.tasks < 2:
+        return list(parent1), list(parent2)
+    point = engine.rng.randrange(1, engine.tasks)
+
+    def child(mother, father):
+        head = set(mother[:point])
+        return mother[:point] + [task for task in father if task not in head]
+
+    return child(parent1, parent2), child(parent2, parent1)
+
+
+# Hartmann's two-point crossover: the head comes from one parent, the middle part from the other one and the tail
+# from the first one again, every part in the relative order of its parent
+def two_point_crossover(engine, parent1, parent2):
+    if engine.tasks < 3:
+        return one_point_crossover(engine, parent1, parent2)
+    point1, point2 = sorted(engine.rng.sample(range(1, engine.tasks), 2))
+
+    def child(mother, father):
+        listed = set(mother[:point1])
+        middle = []
+        for task in father:
+            if len(listed) == point2:
+                break
+            if task not in listed:
+                listed.add(task)
+                middle.append(task)
+        return mother[:point1] + middle + [task for task in mother if task not in listed]
+
+    return child(parent1, parent2), child(parent2, parent1)
+
+
+# Crossover with the number of cut points of the engine
+def crossover(engine, parent1, parent2):
+    if engine.crossover_points == 1:
+        return one_point_crossover(engine, parent1, parent2)
+    return two_point_crossover(engine, parent1, parent2)
+
+
+# Shift mutation: a task moves to a random position between its last predecessor and its first successor
+def shift_mutation(engine, activity_list):
+    rng = engine.rng
+    if rng.random() < engine.mutation_rate and engine.tasks > 1:
+        predecessors, successors = get_precedence(engine)
+        task = activity_list.pop(rng.randrange(len(activity_list)))
+        position = {other: index for index, other in enumerate(activity_list)}
+        first = max((position[pre + 1] + 1 for pre in predecessors[task - 1]), default=0)
+        last = min((position[suc + 1] for suc in successors[task - 1]), default=len(activity_list))
+        activity_list.insert(rng.randint(first, last), task)
+    return activity_list
+
+
+# Makespan of the schedule decoded from the activity list with the serial schedule generation scheme
+def calculate_makespan(engine, activity_list):
+    return get_makespan(genetic.get_start_times(engine, activity_list), engine.task_duration)
@@ -0,0 +1,93 @@
+import math
+
+from ..upmproblems.profiling import profiled
+from ..upmsearch import bounds
+from . import activitylist, genetic, localsearch
+
+cooling_schedules = ('geometric', 'linear')
+
+
+def get_temperature(initial_temperature, cooling, cooling_rate, step, progress):
+    # Geometric: the temperature is multiplied by the cooling rate after every move.
+    # Linear: the temperature falls from the initial one to zero as the budget is spent.
+    if cooling == 'geometric':
+        return initial_temperature * cooling_rate ** step
+    return initial_temperature * max(0.0, 1 - progress)
+
+
+def simulated_annealing(engine, budget, initial_temperature=None, cooling='geometric', cooling_rate=0.999):
+    """
+    Simulated annealing over activity lists of the instance of the engine. Every step moves a random
+    task to a random position between its last predecessor and its first successor, and the move is accepted if the
+    schedule is not longer or with probability exp(-increase / temperature).
+    :param engine: GeneticEngine with the instance and the random number generator of the search
+    :param budget: localsearch.Budget with the limits of the search
+    :param initial_temperature: temperature of the first step, the mean duration of the tasks by default
+    :param cooling: 'geometric' or 'linear' cooling schedule
+    :param cooling_rate: factor applied to the temperature after every step of the geometric cooling
+    :return: tuple with the best activity list found and its makespan
+    """
+    if cooling not in cooling_schedules:
+        raise ValueError(f"Unknown cooling schedule {cooling!r}, expected one of {cooling_schedules}")
+    if initial_temperature is None:
+        initial_temperature = sum(engine.task_duration) / engine.tasks
+    decoder = localsearch.get_decoder(engine)
+    predecessors, successors = activitylist.get_precedence(engine)
+    order = [task - 1 for task in activitylist.longest_tail_activity_list(engine)]
+    makespan = decoder.decode(order)
+    best_order, best_makespan = order, makespan
+    step = 0
+
+    lower_bound = engine.lower_bound
+
+    while not budget.exhausted() and best_makespan > lower_bound:
+        move = localsearch.random_move(engine, order, successors, predecessors)
+        if move is None:
+            break
+        neighbour, position = localsearch.apply_move(order, move)
+        neighbour_makespan = decoder.evaluate(neighbour, position)
+        budget.spend()
+
+        temperature = get_temperature(initial_temperature, cooling, cooling_rate, step, budget.progress())
+        increase = neighbour_makespan - makespan
+        if increase <= 0 or (temperature > 0 and engine.rng.random() < math.exp(-increase / temperature)):
+            order, makespan = neighbour, neighbour_makespan
+            decoder.decode(order, position)
+            if makespan < best_makespan:
+                best_order, best_makespan = order, makespan
+        step += 1
+
+    return [task + 1 for task in best_order], best_makespan
+
+
+@profiled
+def simulated_annealing_schedule(seed, tasks, resources, task_duration, task_resource, task_dependencies,
+                                 max_evaluations=5000, time_limit=None, initial_temperature=None, cooling='geometric',
+                                 cooling_rate=0.999, stats=None):
+    """
+    Returns the best solution found by the simulated annealing
+    :param seed: used to initialize the random number generator
+    :param tasks: number of tasks in the task planning problem with resources
+    :param resources: number of resources in the task planning problem with resources
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param max_evaluations: maximum number of schedules evaluated, None for no limit
+    :param time_limit: maximum time of the search in seconds, None for no limit
+    :param initial_temperature: temperature of the first step, the mean duration of the tasks by default
+    :param cooling: 'geometric' or 'linear' cooling schedule
+    :param cooling_rate: factor applied to the temperature after every step of the geometric cooling
+    :param stats: optional dictionary that receives the number of evaluations, the makespan found, the lower bound,
+                  whether the schedule is proven optimal and the optimality gap
+    :return: list with the start time of each task in the best solution found, or empty list if no solution was found
+    """
+    if tasks == 0:
+        return []
+    engine = genetic.GeneticEngine((tasks, resources, task_duration, task_resource, task_dependencies), seed)
+    lower_bound = engine.lower_bound  # Computed before the budget starts, so the search keeps all its time
+    budget = localsearch.Budget(max_evaluations, time_limit)
+    best_order, makespan = simulated_annealing(engine, budget, initial_temperature, cooling, cooling_rate)
+    if stats is not None:
+        stats['evaluations'] = budget.evaluations
+        stats.update(bounds.optimality_report(makespan, lower_bound))
+    return engine.get_start_times(best_order)
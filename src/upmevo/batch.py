@@ -0,0 +1,223 @@
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ..upmproblems import rcpsp06, rcpsp07, rcpsp10, rcpsp30
+from ..upmproblems.schedule import get_makespan
+from . import annealing, genetic, tabusearch, telemetry
+
+# Solvers that a configuration can name, all of them receive the seed, the instance, a stats dictionary and the
+# options of the configuration and return the start time of each task
+solvers = {
+    'basic': genetic.genetic_algorithm_schedule,
+    'advanced': genetic.advanced_genetic_algorithm_schedule,
+    'tabu': tabusearch.tabu_search_schedule,
+    'annealing': annealing.simulated_annealing_schedule,
+}
+# Solvers that report every generation, so the time to reach the target is measured on the run itself
+history_solvers = ('basic', 'advanced')
+
+
+def get_instance(module):
+    return (module.get_tasks(), module.get_resources(), module.get_task_duration(), module.get_task_resource(),
+            module.get_task_dependencies())
+
+
+def default_instances():
+    return {module.__name__.rsplit('.', 1)[-1]: get_instance(module) for module in (rcpsp06, rcpsp07, rcpsp10, rcpsp30)}
+
+
+# Name of a configuration: its 'name' entry, or the solver followed by its options
+def get_config_name(config):
+    if 'name' in config:
+        return config['name']
+    options = ','.join(f'{key}={value}' for key, value in sorted(config.items()) if key != 'solver')
+    return config.get('solver', 'advanced') + (f'[{options}]' if options else '')
+
+
+def run_job(job):
+    """
+    Runs one solver configuration with one seed on one instance, in a worker process of the batch
+    :param job: tuple with the instance name, the instance, the configuration name, the configuration, the seed and
+                the target makespan (None for no target)
+    :return: dictionary with the result of the run, including the number of violated constraints of its schedule
+             (None when numpy, which the validation needs, is not installed)
+    """
+    instance_name, instance, config_name, config, seed, target = job
+    solver = config.get('solver', 'advanced')
+    options = {key: value for key, value in config.items() if key not in ('name', 'solver')}
+    stats = {}
+    reached = []
+    if target is not None and solver in history_solvers:
+        # Wall time of the first generation whose best makespan, as computed by the algorithm, reaches the target
+        options['history'] = telemetry.Callback(
+            lambda record: reached or record['best'] > target or reached.append(record['wall_time']))
+    start = time.perf_counter()
+    start_times = solvers[solver](seed, *instance, stats=stats, **options)
+    elapsed = time.perf_counter() - start
+
+    makespan = get_makespan(start_times, instance[2]) if start_times else None
+    violations = None
+    if start_times and numpy_available():
+        from ..upmproblems import validation  # numpy is only needed to validate the schedules
+        violations = len(validation.validate_schedule(*instance, start_times))
+    time_to_target = None
+    if target is not None and makespan is not None and makespan <= target:
+        time_to_target = min(reached + [elapsed])
+    return dict(instance=instance_name, config=config_name, seed=seed, makespan=makespan, time=elapsed,
+                target=target, time_to_target=time_to_target, lower_bound=stats.get('lower_bound'),
+                optimal=stats.get('optimal'), gap=stats.get('gap'), violations=violations)
+
+
+def numpy_available():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# Results already written to the results file, a line cut by an interruption is ignored
+def load_results(path):
+    results = []
+    if path is None or not os.path.exists(path):
+        return results
+    with open(path) as file:
+        for line in file:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return results
+
+
+def file_ends_with_newline(path):
+    with open(path, 'rb') as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b'\n'
+
+
+def run_batch(instances, configs, seeds, workers=1, results_path=None, targets=None, callback=None):
+    """
+    Runs every solver configuration with every seed on every instance. Every result is appended to the results file
+    as soon as its run ends, and the runs already in the file are not repeated, so an interrupted batch resumes
+    where it stopped.
+    :param instances: dictionary with the instance (tuple of its parameters) of every instance name
+    :param configs: list of configurations, dictionaries with the 'solver' (one of solvers, 'advanced' by default),
+                    an optional 'name' and the options passed to the solver
+    :param seeds: number of seeds (0 to seeds - 1) or list of seeds
+    :param workers: number of processes running the jobs, 1 runs them in the current process
+    :param results_path: optional JSON lines file that receives the result of every run
+    :param targets: optional dictionary with the target makespan of some instance names
+    :param callback: optional function called with the result of every new run
+    :return: list with the results of all the runs, including the ones loaded from the results file
+    """
+    if workers < 1:
+        raise ValueError(f"The number of workers must be at least 1, got {workers}")
+    for config in configs:
+        if config.get('solver', 'advanced') not in solvers:
+            raise ValueError(f"Unknown solver {config['solver']!r}, expected one of {tuple(solvers)}")
+    seeds = range(seeds) if isinstance(seeds, int) else seeds
+    targets = targets or {}
+    config_names = [get_config_name(config) for config in configs]
+    if len(set(config_names)) < len(config_names):
+        raise ValueError("Every configuration needs a different name")
+
+    results = load_results(results_path)
+    done = {(result['instance'], result['config'], result['seed']) for result in results}
+    jobs = [(instance_name, instance, config_name, config, seed, targets.get(instance_name))
+            for instance_name, instance in instances.items()
+            for config_name, config in zip(config_names, configs)
+            for seed in seeds
+            if (instance_name, config_name, seed) not in done]
+
+    results_file = None
+    if results_path is not None:
+        results_file = open(results_path, 'a')
+        if results_file.tell() > 0 and not file_ends_with_newline(results_path):
+            results_file.write('\n')  # Ends the line cut by the interruption
+    try:
+        def record(result):
+            results.append(result)
+            if results_file is not None:
+                results_file.write(json.dumps(result) + '\n')
+                results_file.flush()
+            if callback is not None:
+                callback(result)
+
+        if workers == 1:
+            for job in jobs:
+                record(run_job(job))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for future in as_completed([executor.submit(run_job, job) for job in jobs]):
+                    record(future.result())
+    finally:
+        if results_file is not None:
+            results_file.close()
+    return results
+
+
+def summarize(values):
+    if len(values) == 1:
+        return dict(best=values[0], mean=values[0], median=values[0], q1=values[0], q3=values[0], worst=values[0],
+                    stdev=0.0)
+    q1, _, q3 = statistics.quantiles(values, n=4, method='inclusive')
+    return dict(best=min(values), mean=statistics.fmean(values), median=statistics.median(values), q1=q1, q3=q3,
+                worst=max(values), stdev=statistics.stdev(values))
+
+
+def aggregate(results):
+    """
+    Statistics of the runs of every configuration on every instance
+    :param results: list of results returned by run_batch
+    :return: dictionary from (instance name, configuration name) to a dictionary with the number of runs, the
+             statistics of the makespan (best, mean, median, quartiles, worst and standard deviation), the mean time,
+             the share of runs that reached the target, the statistics of their time to target, the share of runs
+             whose schedule is proven optimal by the lower bound and the number of runs with an infeasible schedule
+    """
+    groups = {}
+    for result in results:
+        groups.setdefault((result['instance'], result['config']), []).append(result)
+    summary = {}
+    for key, runs in sorted(groups.items()):
+        makespans = [run['makespan'] for run in runs if run['makespan'] is not None]
+        times_to_target = [run['time_to_target'] for run in runs if run['time_to_target'] is not None]
+        summary[key] = dict(
+            runs=len(runs),
+            makespan=summarize(makespans) if makespans else None,
+            mean_time=statistics.fmean(run['time'] for run in runs),
+            target_rate=len(times_to_target) / len(runs) if runs[0]['target'] is not None else None,
+            time_to_target=summarize(times_to_target) if times_to_target else None,
+            optimal_rate=sum(bool(run.get('optimal')) for run in runs) / len(runs),
+            infeasible=sum(bool(run.get('violations')) for run in runs),
+        )
+    return summary
+
+
+def format_summary(summary):
+    lines = [f"{'instance':<10} {'config':<40} {'runs':>4} {'best':>5} {'mean':>7} {'median':>6} {'q1':>6} {'q3':>6} "
+             f"{'time':>7} {'target':>6} {'ttt':>7}"]
+    for (instance_name, config_name), stats in summary.items():
+        makespan = stats['makespan'] or dict.fromkeys(('best', 'mean', 'median', 'q1', 'q3'), float('nan'))
+        target_rate = '-' if stats['target_rate'] is None else f"{stats['target_rate']:.0%}"
+        time_to_target = '-' if stats['time_to_target'] is None else f"{stats['time_to_target']['median']:.3f}"
+        lines.append(f"{instance_name:<10} {config_name:<40} {stats['runs']:>4} {makespan['best']:>5} "
+                     f"{makespan['mean']:>7.2f} {makespan['median']:>6} {makespan['q1']:>6} {makespan['q3']:>6} "
+                     f"{stats['mean_time']:>7.3f} {target_rate:>6} {time_to_target:>7}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    # Optimal makespans of the instances of the assignment
+    optima = {'rcpsp06': 13, 'rcpsp07': 7, 'rcpsp10': 20, 'rcpsp30': 35}
+    configs = [
+        {'solver': 'advanced'},
+        {'solver': 'advanced', 'encoding': 'activity_list'},
+        {'solver': 'advanced', 'encoding': 'random_key'},
+        {'solver': 'tabu', 'max_evaluations': 2000},
+    ]
+    results = run_batch(default_instances(), configs, 10, workers=os.cpu_count(), targets=optima)
+    print(format_summary(aggregate(results)))
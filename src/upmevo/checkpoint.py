@@ -0,0 +1,93 @@
+import os
+import pickle
+import zlib
+
+from . import diversity, genetic, localsearch
+
+# Version of the layout of the saved state, a checkpoint of another version is not loaded
+checkpoint_version = 4
+
+
+class Checkpoint:
+    """
+    Saves the state of a run of the generational genetic algorithms every few generations to a compressed binary
+    file: the population and its makespans, the best schedule, the generation and no-improvement counters, the random
+    number generator, mutation rate and lower bound of the engine, the cache of a DeduplicatingEvaluator and the local
+    optima of the local search. A run given the checkpoint of an interrupted run with the same instance and settings continues
+    from the last saved generation exactly as the interrupted run would have.
+    :param path: path of the checkpoint file, replaced at every save
+    :param interval: number of generations between saves
+    """
+    def __init__(self, path, interval=10):
+        if interval < 1:
+            raise ValueError(f"The checkpoint interval must be at least 1, got {interval}")
+        self.path = path
+        self.interval = interval
+
+    def load(self, engine):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'rb') as file:
+            state = pickle.loads(zlib.decompress(file.read()))
+        if state['version'] != checkpoint_version:
+            raise ValueError(f"Checkpoint {self.path!r} has version {state['version']}, expected {checkpoint_version}")
+        if state['instance'] != engine.instance or state['settings'] != get_settings(engine):
+            raise ValueError(f"Checkpoint {self.path!r} belongs to a run with another instance or other settings")
+        return state
+
+    def restore(self, engine, evaluator):
+        """
+        Loads the saved state into the engine and the evaluator
+        :return: tuple with the population, its makespans, the best schedule, its makespan, the next generation and
+                 the number of generations without improvement, or None if there is no checkpoint yet
+        """
+        state = self.load(engine)
+        if state is None:
+            return None
+        engine.rng.setstate(state['rng_state'])
+        engine.mutation_rate = state['mutation_rate']
+        engine.cache['lower_bound'] = state['lower_bound']  # Not computed again on resume
+        if isinstance(evaluator, diversity.DeduplicatingEvaluator) and state['evaluator_cache'] is not None:
+            evaluator.cache, evaluator.hits, evaluator.misses = state['evaluator_cache']
+        if state['local_optima'] is not None:
+            localsearch.get_decoder(engine).local_optima = state['local_optima']
+        return (state['population'], state['fitness'], state['best_schedule'], state['best_makespan'],
+                state['generation'], state['no_improvement_count'])
+
+    def update(self, engine, generation, population, fitness, best_schedule, best_makespan, no_improvement_count,
+               evaluator):
+        # Called at the end of every generation, saves the state of the run every interval generations
+        if (generation + 1) % self.interval == 0:
+            self.save(engine, generation + 1, population, fitness, best_schedule, best_makespan, no_improvement_count,
+                      evaluator)
+
+    def save(self, engine, generation, population, fitness, best_schedule, best_makespan, no_improvement_count,
+             evaluator):
+        decoder = engine.cache.get('decoder')
+        state = dict(
+            version=checkpoint_version,
+            instance=engine.instance,
+            settings=get_settings(engine),
+            rng_state=engine.rng.getstate(),
+            mutation_rate=engine.mutation_rate,
+            lower_bound=engine.lower_bound,
+            population=population,
+            fitness=fitness,
+            best_schedule=best_schedule,
+            best_makespan=best_makespan,
+            generation=generation,
+            no_improvement_count=no_improvement_count,
+            evaluator_cache=None,
+            local_optima=decoder.local_optima if decoder is not None else None,
+        )
+        if isinstance(evaluator, diversity.DeduplicatingEvaluator):
+            state['evaluator_cache'] = (evaluator.cache, evaluator.hits, evaluator.misses)
+        # The new file replaces the old one only once it is complete, so an interruption never leaves a broken one
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)))
+        os.replace(temporary_path, self.path)
+
+
+def get_settings(engine):
+    return {name: getattr(engine, name) for name in genetic.config_attributes}
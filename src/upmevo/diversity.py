@@ -0,0 +1,132 @@
+import statistics
+from functools import partial
+
+from . import genetic, randomkey
+
+# Number of rounds of new random individuals drawn to fill the slots left by the duplicates
+immigrant_rounds = 3
+
+
+def genotype_key(schedule):
+    return tuple(schedule)
+
+
+class DeduplicatingEvaluator:
+    """
+    Evaluator that computes every genotype only once. Together with the makespan it keeps a hash of the decoded start
+    times (the phenotype), so that different genotypes of the same schedule are recognised as clones. The
+    permutations are not evaluated on a decoded schedule, their phenotype is the permutation itself.
+    :param evaluator: SerialEvaluator or ProcessPoolEvaluator that computes the new genotypes
+    :param max_cache_size: number of genotypes kept, the oldest half is dropped when it grows larger
+    """
+    def __init__(self, evaluator, max_cache_size=100000):
+        self.evaluator = evaluator
+        self.max_cache_size = max_cache_size
+        self.cache = {}  # Genotype key -> (makespan, phenotype key)
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, population):
+        new = {}
+        for schedule in population:
+            key = genotype_key(schedule)
+            if key in self.cache or key in new:
+                self.hits += 1
+            else:
+                self.misses += 1
+                new[key] = schedule
+        if len(self.cache) + len(new) > self.max_cache_size:
+            for key in list(self.cache)[:len(self.cache) // 2]:
+                del self.cache[key]
+            new.update((genotype_key(schedule), schedule) for schedule in population
+                       if genotype_key(schedule) not in self.cache)
+        self.cache.update(zip(new, self.evaluator.map(genetic.evaluate_with_phenotypes, list(new.values()))))
+        return [self.cache[genotype_key(schedule)][0] for schedule in population]
+
+    # Number of schedules decoded, the cache hits are not counted
+    @property
+    def evaluations(self):
+        return self.evaluator.evaluations
+
+    def phenotype_key(self, schedule):
+        if genotype_key(schedule) not in self.cache:
+            self.evaluate([schedule])  # Dropped from the cache since it was evaluated
+        return self.cache[genotype_key(schedule)][1]
+
+    def close(self):
+        self.evaluator.close()
+
+
+def unique_indices(population, fitness, size, evaluator):
+    # Positions of the best individuals with different genotypes and phenotypes, and of the remaining individuals
+    # with a new genotype but a repeated phenotype
+    genotypes = set()
+    phenotypes = set()
+    selected = []
+    spare = []
+    for i in sorted(range(len(population)), key=fitness.__getitem__):
+        genotype = genotype_key(population[i])
+        if genotype in genotypes:
+            continue
+        genotypes.add(genotype)
+        phenotype = evaluator.phenotype_key(population[i])
+        if phenotype in phenotypes:
+            spare.append(i)
+            continue
+        phenotypes.add(phenotype)
+        selected.append(i)
+        if len(selected) == size:
+            break
+    return selected, spare
+
+
+def select_unique_population(engine, population, fitness, size, evaluator, new_individuals=None):
+    """
+    Selects the best individuals keeping only one copy of every genotype and of every decoded schedule. The slots
+    left are filled with new random individuals and, if the instance has too few different schedules, with the
+    best individuals that only repeat a schedule.
+    :param engine: GeneticEngine of the run
+    :param population: list of schedules
+    :param fitness: list with the makespan of every schedule
+    :param size: number of individuals to select
+    :param evaluator: DeduplicatingEvaluator that has evaluated the population
+    :param new_individuals: function returning a number of new random individuals, the initialisation of the
+                            encoding of the engine by default
+    :return: the selected schedules and their makespans, sorted by makespan
+    """
+    new_individuals = new_individuals or partial(engine.operators.initialize_population, engine)
+    population = list(population)
+    fitness = list(fitness)
+    selected, spare = unique_indices(population, fitness, size, evaluator)
+    for _ in range(immigrant_rounds):
+        if len(selected) >= size:
+            break
+        immigrants = new_individuals(size - len(selected))
+        population.extend(immigrants)
+        fitness.extend(evaluator.evaluate(immigrants))
+        selected, spare = unique_indices(population, fitness, size, evaluator)
+    selected.extend(spare[:size - len(selected)])
+    selected.sort(key=fitness.__getitem__)
+    return [population[i] for i in selected], [fitness[i] for i in selected]
+
+
+def diversity_metrics(population, fitness, evaluator=None, encoding='permutation'):
+    """
+    Diversity of a population: share of different genotypes and (with a DeduplicatingEvaluator) of different decoded
+    schedules, mean share of positions in which the individuals differ from the best one and deviation of the makespans.
+    The random keys are compared on the task orders they give, since their values only matter through their ranks.
+    """
+    size = len(population)
+    orders = randomkey.get_task_orders(population) if encoding == 'random_key' else population
+    best = orders[min(range(size), key=fitness.__getitem__)]
+    metrics = {
+        'unique_genotypes': len(set(map(genotype_key, population))) / size,
+        'unique_phenotypes': None,
+        'distance_to_best': sum(sum(a != b for a, b in zip(order, best))
+                                for order in orders) / (size * max(1, len(best))),
+        'makespan_deviation': statistics.pstdev(fitness),
+    }
+    if isinstance(evaluator, DeduplicatingEvaluator):
+        metrics['unique_phenotypes'] = len(set(map(evaluator.phenotype_key, population))) / size
+    return metrics
+
@@ -0,0 +1,116 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from . import genetic
+
+# Every chunk should take this many times longer to decode than to be sent to a worker and back
+chunk_cost_ratio = 10
+
+
+# Engine of a worker process of a ProcessPoolEvaluator, with the instance and the encoding of the pool
+worker_engine = None
+
+
+# Load the instance and the encoding in a worker process
+def init_worker(instance, encoding):
+    global worker_engine
+    worker_engine = genetic.GeneticEngine(instance, encoding=encoding)
+
+
+def call_in_worker(function, schedules):
+    return function(worker_engine, schedules)
+
+
+class SerialEvaluator:
+    """
+    Evaluates the makespan of every schedule of a batch in the current process
+    :param engine: GeneticEngine with the instance and the encoding of the schedules
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.evaluations = 0  # Number of schedules decoded
+
+    def evaluate(self, population):
+        return self.map(genetic.evaluate_schedules, population)
+
+    # Apply a function of the genetic module, which takes the engine and a batch of schedules, to the whole batch
+    def map(self, function, population):
+        self.evaluations += len(population)
+        return function(self.engine, population)
+
+    def close(self):
+        pass
+
+
+class ProcessPoolEvaluator:
+    """
+    Evaluates the makespan of the schedules of a batch in a pool of processes. The instance is sent once to every
+    worker when the pool starts, so the tasks only carry the schedules. The makespans come back in the order of the
+    batch and the random choices of the algorithm stay in the calling process, so the result of a seed does not
+    depend on the number of workers.
+    :param workers: number of worker processes
+    :param engine: GeneticEngine whose instance and encoding are loaded in the engine of every worker
+    :param chunksize: number of schedules sent together to a worker, tuned on the first batch if not given: a share
+                      of it is evaluated in this process to time the decoding and the rest goes to the workers
+    """
+    def __init__(self, workers, engine, chunksize=None):
+        self.workers = workers
+        self.engine = engine
+        self.chunksize = chunksize
+        self.evaluations = 0  # Number of schedules decoded
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                            initargs=(engine.instance, engine.encoding))
+
+    def tune_chunksize(self, function, population):
+        # Cost of decoding one schedule, measured in this process with the engine of the run on the first share of
+        # the batch, whose results are returned with the chunk size
+        sample = population[:max(1, len(population) // self.workers)]
+        start = time.perf_counter()
+        results = function(self.engine, sample)
+        decode_cost = (time.perf_counter() - start) / len(sample)
+
+        # Cost of a round trip to a worker, once the workers have started
+        list(self.executor.map(len, [()] * self.workers))
+        start = time.perf_counter()
+        list(self.executor.map(len, [()] * self.workers, chunksize=1))
+        round_trip_cost = (time.perf_counter() - start) / self.workers
+
+        return results, max(1, int(chunk_cost_ratio * round_trip_cost / max(decode_cost, 1e-9)))
+
+    def evaluate(self, population):
+        return self.map(genetic.evaluate_schedules, population)
+
+    # Apply a function of the genetic module, which takes the engine and a batch of schedules, to chunks of the batch
+    # in the workers, with their own engine
+    def map(self, function, population):
+        if not population:
+            return []
+        self.evaluations += len(population)
+        results = []
+        if self.chunksize is None:
+            # The schedules timed to tune the chunk size are not sent to the workers again
+            results, self.chunksize = self.tune_chunksize(function, population)
+            population = population[len(results):]
+        # Large chunks are still split so that every worker gets a share of the batch
+        chunksize = max(1, min(self.chunksize, -(-len(population) // self.workers)))
+        chunks = [population[start:start + chunksize] for start in range(0, len(population), chunksize)]
+        return results + [result for chunk_results in self.executor.map(partial(call_in_worker, function), chunks)
+                          for result in chunk_results]
+
+    def close(self):
+        self.executor.shutdown()
+
+
+def get_evaluator(workers, engine):
+    """
+    Returns the evaluator of the makespans for the given number of workers
+    :param workers: number of worker processes, 1 evaluates in the current process
+    :param engine: GeneticEngine with the instance and the encoding of the schedules
+    :return: SerialEvaluator or ProcessPoolEvaluator
+    """
+    if workers < 1:
+        raise ValueError(f"The number of workers must be at least 1, got {workers}")
+    if workers == 1:
+        return SerialEvaluator(engine)
+    return ProcessPoolEvaluator(workers, engine)
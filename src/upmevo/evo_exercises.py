@@ -1,5 +1,15 @@
+from functools import partial
 
-def exercise3(seed=0, tasks=0, resources=0, task_duration=[], task_resource=[], task_dependencies=[]):
+from ..upmproblems.profiling import profiled
+from ..upmproblems.reverse import solve_in_direction
+from ..upmproblems.solutioncache import solve_cached
+from ..upmsearch import bounds
+from .genetic import advanced_genetic_algorithm_schedule, genetic_algorithm_schedule
+
+
+@profiled
+def exercise3(seed=0, tasks=0, resources=0, task_duration=[], task_resource=[], task_dependencies=[], direction='forward', workers=1,
+              steady_state=False, encoding='permutation', vectorized=False, deduplicate=False, cache=None):
     """
     Returns the best solution found by the basic genetic algorithm of exercise 3
     :param seed: used to initialize the random number generator
@@ -8,12 +18,33 @@ def exercise3(seed=0, tasks=0, resources=0, task_duration=[], task_resource=[],
     :param task_duration: list of durations of the tasks
     :param task_resource: list of resources required by each task
     :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param direction: 'forward', 'backward' (solve the reversed instance) or 'both' (solve both in parallel)
+    :param workers: number of processes evaluating the makespans, the result of a seed does not depend on it
+    :param steady_state: whether the offspring replace the worst individuals one pair at a time
+    :param encoding: 'permutation', 'activity_list' (task orders that respect the dependencies) or 'random_key'
+                     (a priority for every task)
+    :param vectorized: whether to keep the population in a numpy array and breed the whole generation at once
+    :param deduplicate: whether to evaluate every genotype once and keep one copy of every schedule in the population
+    :param cache: optional SolutionCache, or path of its database: its schedule of the instance is returned at once
+                  if it is proven optimal, used as warm start otherwise, and the schedule found is stored in it
+    :param profile: optional prefix of the paths of the files of src.upmproblems.profiling.profile_call, the run is
+                    then profiled (only in this process with direction='both')
     :return: list with the start time of each task in the best solution found, or empty list if no solution was found
     """
-    return []
+    solver = partial(genetic_algorithm_schedule, seed, workers=workers, steady_state=steady_state, encoding=encoding, vectorized=vectorized, deduplicate=deduplicate)
+    if cache is None:
+        return solve_in_direction(solver, direction, tasks, resources, task_duration, task_resource, task_dependencies)
+    return solve_cached(cache, 'exercise3', lambda warm_start: solve_in_direction(solver, direction, tasks, resources, task_duration, task_resource, task_dependencies, warm_start),
+                        tasks, resources, task_duration, task_resource, task_dependencies,
+                        lower_bound=bounds.lower_bound,
+                        metadata=dict(seed=seed, direction=direction, steady_state=steady_state, encoding=encoding,
+                                      vectorized=vectorized, deduplicate=deduplicate))
 
 
-def exercise4(seed=0, tasks=0, resources=0, task_duration=[], task_resource=[], task_dependencies=[]):
+@profiled
+def exercise4(seed=0, tasks=0, resources=0, task_duration=[], task_resource=[], task_dependencies=[], direction='forward', workers=1,
+              steady_state=False, encoding='permutation', vectorized=False, local_search=False, deduplicate=False,
+              cache=None):
     """
     Returns the best solution found by the advanced genetic algorithm of exercise 4
     :param seed: used to initialize the random number generator
@@ -22,6 +53,26 @@ def exercise4(seed=0, tasks=0, resources=0, task_duration=[], task_resource=[],
     :param task_duration: list of durations of the tasks
     :param task_resource: list of resources required by each task
     :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param direction: 'forward', 'backward' (solve the reversed instance) or 'both' (solve both in parallel)
+    :param workers: number of processes evaluating the makespans, the result of a seed does not depend on it
+    :param steady_state: whether the offspring replace the worst individuals one pair at a time
+    :param encoding: 'permutation', 'activity_list' (task orders that respect the dependencies) or 'random_key'
+                     (a priority for every task)
+    :param vectorized: whether to keep the population in a numpy array and breed the whole generation at once
+    :param local_search: whether to improve the elite individuals of every generation with a local search of the
+                         critical tasks (only with the activity list encoding)
+    :param deduplicate: whether to evaluate every genotype once and keep one copy of every schedule in the population
+    :param cache: optional SolutionCache, or path of its database: its schedule of the instance is returned at once
+                  if it is proven optimal, used as warm start otherwise, and the schedule found is stored in it
+    :param profile: optional prefix of the paths of the files of src.upmproblems.profiling.profile_call, the run is
+                    then profiled (only in this process with direction='both')
     :return: list with the start time of each task in the best solution found, or empty list if no solution was found
     """
-    return []
+    solver = partial(advanced_genetic_algorithm_schedule, seed, workers=workers, steady_state=steady_state, encoding=encoding, vectorized=vectorized, local_search=local_search, deduplicate=deduplicate)
+    if cache is None:
+        return solve_in_direction(solver, direction, tasks, resources, task_duration, task_resource, task_dependencies)
+    return solve_cached(cache, 'exercise4', lambda warm_start: solve_in_direction(solver, direction, tasks, resources, task_duration, task_resource, task_dependencies, warm_start),
+                        tasks, resources, task_duration, task_resource, task_dependencies,
+                        lower_bound=bounds.lower_bound,
+                        metadata=dict(seed=seed, direction=direction, steady_state=steady_state, encoding=encoding,
+                                      vectorized=vectorized, local_search=local_search, deduplicate=deduplicate))
@@ -0,0 +1,434 @@
+import random
+from collections import namedtuple
+
+from ..upmproblems.profiling import profiled
+from ..upmproblems.schedule import get_makespan, serial_schedule
+from ..upmsearch import bounds
+from . import activitylist, diversity, evaluation, localsearch, randomkey, selection, steadystate, telemetry
+
+encodings = ('permutation', 'activity_list', 'random_key')
+OperatorSet = namedtuple('OperatorSet', ['initialize_population', 'crossover', 'mutate', 'calculate_makespan',
+                                         'get_start_times'])
+
+# Settings of the engine, a checkpoint is only resumed by an engine with the same ones
+config_attributes = ('population_size', 'generations', 'initial_mutation_rate', 'max_no_improvement', 'encoding',
+                     'selection_method', 'crossover_points', 'crossover_bias', 'rank_pressure',
+                     'local_search_evaluations')
+
+
+class GeneticEngine:
+    """
+    Instance, settings, random number generator and adapted mutation rate of one run of the genetic algorithms. The
+    operators of the upmevo modules receive the engine they work on, so several engines can run in the same process
+    without sharing any state.
+    :param instance: tuple with the tasks, resources, task_duration, task_resource and task_dependencies
+    :param seed: seed of the random number generator of the engine
+    :param population_size: number of individuals of the population
+    :param generations: maximum number of generations
+    :param initial_mutation_rate: mutation rate of the first generation, the advanced algorithm decreases it
+    :param max_no_improvement: termination condition: stop if no improvement for this many generations
+    :param encoding: representation of the schedules and operators applied to them, one of encodings
+    :param selection_method: 'tournament', 'rank' or 'sus', see the selection module
+    :param crossover_points: number of cut points of the crossover of the activity lists, 1 or 2
+    :param crossover_bias: probability that a child takes each key from its first parent in the uniform crossover
+                           of the random keys
+    :param rank_pressure: selection pressure of the rank selection, expected number of copies of the best
+                          individual, between 1 and 2
+    :param local_search_evaluations: maximum number of neighbours evaluated when the local search improves one
+                                     individual
+    :param warm_start: optional start times of a known schedule of the instance, encoded as the first individual of
+                       the initial population
+    """
+    def __init__(self, instance=(0, 0, [], [], []), seed=None, population_size=50, generations=100,
+                 initial_mutation_rate=0.2, max_no_improvement=10, encoding='permutation',
+                 selection_method='tournament', crossover_points=2, crossover_bias=0.5, rank_pressure=1.5,
+                 local_search_evaluations=200, warm_start=None):
+        if encoding not in encodings:
+            raise ValueError(f"Unknown encoding {encoding!r}, expected one of {encodings}")
+        if selection_method not in selection.methods:
+            raise ValueError(f"Unknown selection method {selection_method!r}, expected one of {tuple(selection.methods)}")
+        if crossover_points not in (1, 2):
+            raise ValueError(f"The crossover of the activity lists has 1 or 2 cut points, got {crossover_points}")
+        self.population_size = population_size
+        self.generations = generations
+        self.initial_mutation_rate = initial_mutation_rate
+        self.max_no_improvement = max_no_improvement
+        self.encoding = encoding
+        self.selection_method = selection_method
+        self.crossover_points = crossover_points
+        self.crossover_bias = crossover_bias
+        self.rank_pressure = rank_pressure
+        self.local_search_evaluations = local_search_evaluations
+        self.warm_start = warm_start
+        self.rng = random.Random(seed)
+        self.set_instance(*instance)
+
+    # Load the problem parameters and restore the mutation rate adapted by a previous run
+    def set_instance(self, tasks, resources, task_duration, task_resource, task_dependencies):
+        self.tasks = tasks
+        self.resources = resources
+        self.task_duration = task_duration
+        self.task_resource = task_resource
+        self.task_dependencies = task_dependencies
+        self.mutation_rate = self.initial_mutation_rate
+        self.cache = {}  # Data derived from the instance, such as the precedence lists and the list decoder
+
+    @property
+    def instance(self):
+        return self.tasks, self.resources, self.task_duration, self.task_resource, self.task_dependencies
+
+    @property
+    def operators(self):
+        return get_operators(self.encoding)
+
+    @property
+    def lower_bound(self):
+        # Computed once per instance, the algorithms stop as soon as their best schedule reaches it
+        if 'lower_bound' not in self.cache:
+            self.cache['lower_bound'] = bounds.lower_bound(*self.instance)
+        return self.cache['lower_bound']
+
+    def is_optimal(self, schedule, makespan):
+        if makespan > self.lower_bound:
+            return False
+        if self.encoding == 'permutation':
+            # The makespan of a permutation is an estimate, the schedule it decodes to has to reach the bound
+            return get_makespan(self.get_start_times(schedule), self.task_duration) <= self.lower_bound
+        return True
+
+    def run(self, advanced=False, evaluator=None, steady_state=False, vectorized=False, local_search=False,
+            history=None, checkpoint=None):
+        """
+        Runs the basic or the advanced genetic algorithm with this engine
+        :return: tuple with the best schedule and its makespan
+        """
+        if advanced:
+            return advanced_genetic_algorithm(self, evaluator, steady_state, vectorized, local_search, history,
+                                              checkpoint)
+        return genetic_algorithm(self, evaluator, steady_state, vectorized, history, checkpoint)
+
+    def solve(self, advanced=False, workers=1, deduplicate=False, stats=None, **options):
+        """
+        Runs the genetic algorithm with the evaluator for the number of workers and decodes the best schedule
+        :param stats: optional dictionary that receives the makespan found, the lower bound, whether the schedule
+                      is proven optimal and the optimality gap
+        :return: list with the start time of each task in the best schedule found
+        """
+        evaluator = evaluation.get_evaluator(workers, self)
+        if deduplicate:
+            evaluator = diversity.DeduplicatingEvaluator(evaluator)
+        try:
+            best_schedule, makespan = self.run(advanced, evaluator, **options)
+        finally:
+            evaluator.close()
+        start_times = self.get_start_times(best_schedule)
+        if stats is not None:
+            stats.update(bounds.optimality_report(get_makespan(start_times, self.task_duration), self.lower_bound))
+        return start_times
+
+    def get_start_times(self, schedule):
+        return self.operators.get_start_times(self, schedule)
+
+
+# Operators of an encoding, all of them take the engine as first argument. The permutations ignore the
+# dependencies, the activity lists always respect them and the random keys are priorities; the last two are
+# evaluated on the schedule built by the serial schedule generation scheme.
+def get_operators(encoding):
+    if encoding == 'activity_list':
+        return OperatorSet(activitylist.initialize_population, activitylist.crossover, activitylist.shift_mutation,
+                           activitylist.calculate_makespan, get_start_times)
+    if encoding == 'random_key':
+        return OperatorSet(randomkey.initialize_population, randomkey.crossover, randomkey.mutate,
+                           randomkey.calculate_makespan, randomkey.get_start_times)
+    return OperatorSet(initialize_population, crossover, mutate, calculate_makespan, get_start_times)
+
+# Start times of every schedule of a batch in the encoding of the engine, the random keys of the whole batch are
+# ordered at once
+def decode_schedules(engine, schedules):
+    if engine.encoding == 'random_key':
+        return randomkey.decode_population(engine, schedules)
+    get_start_times = engine.operators.get_start_times
+    return [get_start_times(engine, schedule) for schedule in schedules]
+
+# Makespans of a batch of schedules in the encoding of the engine
+def evaluate_schedules(engine, schedules):
+    if engine.encoding == 'random_key':
+        return [get_makespan(start_times, engine.task_duration) for start_times in decode_schedules(engine, schedules)]
+    calculate_makespan = engine.operators.calculate_makespan
+    return [calculate_makespan(engine, schedule) for schedule in schedules]
+
+# Makespans of a batch of schedules in the encoding of the engine and hashes of their decoded start times. The
+# makespan of a permutation is not computed on a decoded schedule, so the permutation itself is hashed instead of
+# decoding it a second time.
+def evaluate_with_phenotypes(engine, schedules):
+    if engine.encoding == 'permutation':
+        return [(makespan, hash(tuple(schedule)))
+                for makespan, schedule in zip(evaluate_schedules(engine, schedules), schedules)]
+    return [(get_makespan(start_times, engine.task_duration), hash(tuple(start_times)))
+            for start_times in decode_schedules(engine, schedules)]
+
+# Individual of the encoding of the engine listing the tasks by start time. The serial schedule generation scheme
+# never starts a task later than the schedule does, so the individual decodes to a schedule at least as short.
+def encode_start_times(engine, start_times):
+    order = sorted(range(len(start_times)), key=lambda task: (start_times[task], task))
+    if engine.encoding == 'random_key':
+        keys = [0.0] * len(order)
+        for rank, task in enumerate(order):
+            keys[task] = rank / len(order)
+        return randomkey.as_keys(keys)
+    return [task + 1 for task in order]
+
+
+# Random initial population whose first individual is the warm start of the engine, if it has one
+def initial_population(engine, population_size):
+    population = engine.operators.initialize_population(engine, population_size)
+    if engine.warm_start is not None and population:
+        population[0] = encode_start_times(engine, engine.warm_start)
+    return population
+
+
+# Initialize a population of schedules
+def initialize_population(engine, population_size):
+    tasks = engine.tasks
+    population = []
+    for _ in range(population_size):
+        schedule = engine.rng.sample(range(1, tasks + 1), tasks)
+        population.append(schedule)
+    return population
+
+# Calculate makespan for a schedule
+def calculate_makespan(engine, schedule):
+    task_duration, task_resource, task_dependencies = engine.task_duration, engine.task_resource, engine.task_dependencies
+    task_finish_time = [0] * engine.tasks
+    for task in schedule:
+        dependencies = [dependency for dependency in task_dependencies if dependency[1] == task]
+        if dependencies:
+            start_time = max(task_finish_time[dependency[0] - 1] for dependency in dependencies)
+        else:
+            start_time = 0
+        end_time = start_time + task_duration[task - 1]
+        
+        # Check for resource availability and non-overlapping tasks
+        resource = task_resource[task - 1]
+        if all(task_finish_time[i] <= start_time or task_resource[i] != resource for i in range(task)):
+            task_finish_time[task - 1] = end_time
+        else:
+            # If there's an overlap, adjust the start time
+            start_time = max(task_finish_time[i] for i in range(task))
+            end_time = start_time + task_duration[task - 1]
+            task_finish_time[task - 1] = end_time
+    return max(task_finish_time)
+
+# Selection: Tournament selection, the makespans of the population are given in the same order
+def tournament_selection(engine, population, fitness, k=5):
+    selected = engine.rng.sample(range(len(population)), k)
+    return population[min(selected, key=fitness.__getitem__)]
+
+# Crossover: Two-point crossover with non-overlapping constraint
+def crossover(engine, parent1, parent2):
+    point1, point2 = engine.rng.sample(range(1, engine.tasks), 2)
+    if point1 > point2:
+        point1, point2 = point2, point1
+    
+    # Ensure non-overlapping tasks
+    child1 = [task for task in parent1 if task not in parent2[point1:point2]]
+    child2 = [task for task in parent2 if task not in parent1[point1:point2]]
+    
+    return child1[:point1] + parent2[point1:point2] + child1[point1:], child2[:point1] + parent1[point1:point2] + child2[point1:]
+
+# Mutation: Swap mutation with non-overlapping constraint
+def mutate(engine, schedule):
+    if engine.rng.random() < engine.mutation_rate:
+        point1, point2 = engine.rng.sample(range(engine.tasks), 2)
+        
+        # Ensure non-overlapping tasks
+        while schedule[point1] in schedule[point2:point2 + 2] or schedule[point2] in schedule[point1:point1 + 2]:
+            point1, point2 = engine.rng.sample(range(engine.tasks), 2)
+        
+        schedule[point1], schedule[point2] = schedule[point2], schedule[point1]
+    return schedule
+
+# Define a function to select the best population, returns the selected schedules and their makespans
+def select_best_population(population, fitness, size):
+    best = sorted(range(len(population)), key=fitness.__getitem__)[:size]
+    return [population[i] for i in best], [fitness[i] for i in best]
+
+# Create the offspring of a population with the genetic operators, the parents of the whole generation are
+# selected at once from the makespans of the population
+def breed(engine, population, fitness, pairs):
+    operators = engine.operators
+    parents = selection.select_parents(engine, fitness, 2 * pairs)
+    new_population = []
+    for pair in range(pairs):
+        parent1 = population[parents[2 * pair]]
+        parent2 = population[parents[2 * pair + 1]]
+        child1, child2 = operators.crossover(engine, parent1, parent2)
+        child1 = operators.mutate(engine, child1)
+        child2 = operators.mutate(engine, child2)
+        new_population.extend([child1, child2])
+    return new_population
+
+# Select the best solutions for the next generation, keeping one copy of each when the evaluator removes duplicates
+def select_next_population(engine, population, fitness, size, evaluator):
+    if isinstance(evaluator, diversity.DeduplicatingEvaluator):
+        return diversity.select_unique_population(engine, population, fitness, size, evaluator)
+    return select_best_population(population, fitness, size)
+
+# One generation of the genetic algorithm, returns the next population and its makespans
+def next_generation(engine, population, fitness, best_schedule, best_makespan, evaluator):
+    population_size = engine.population_size
+    new_population = breed(engine, population, fitness, population_size)
+
+    # Keep the best solution found
+    new_population.append(best_schedule)
+    new_fitness = evaluator.evaluate(new_population[:-1]) + [best_makespan]
+
+    # Select the best solutions for the next generation
+    return select_next_population(engine, new_population, new_fitness, population_size, evaluator)
+
+# One generation of the advanced genetic algorithm, returns the next population and its makespans. With the local
+# search the elite individuals of the next population are improved before it is returned.
+def next_advanced_generation(engine, population, fitness, evaluator, local_search=False):
+    population_size = engine.population_size
+    elite_size = int(0.1 * population_size)  # Percentage of elite individuals
+    new_population = breed(engine, population, fitness, population_size - elite_size)
+
+    # Only the offspring are evaluated, the makespans of the elite individuals are already known
+    new_fitness = evaluator.evaluate(new_population)
+
+    # Keep the elite individuals from the previous population
+    elite, elite_fitness = select_best_population(population, fitness, elite_size)
+    new_population.extend(elite)
+    new_fitness.extend(elite_fitness)
+
+    # Decrease mutation rate over time
+    engine.mutation_rate = max(0.05, engine.mutation_rate * 0.95)
+
+    # Select the best solutions for the next generation
+    population, fitness = select_next_population(engine, new_population, new_fitness, population_size, evaluator)
+    if local_search:
+        population, fitness = localsearch.improve_elite(engine, population, fitness, elite_size)
+    return population, fitness
+
+# Genetic Algorithm, the makespans of every generation are computed in one batch by the evaluator
+def genetic_algorithm(engine, evaluator=None, steady_state=False, vectorized=False, history=None, checkpoint=None):
+    if checkpoint is not None and (steady_state or vectorized):
+        raise ValueError("The checkpoints need the generational algorithm")
+    if steady_state:
+        return steadystate.steady_state_genetic_algorithm(engine, evaluator, history=history)
+    if vectorized:
+        from . import vectorized as vectorized_module  # numpy is only needed for this mode
+        return vectorized_module.vectorized_genetic_algorithm(engine, evaluator, history=history)
+    evaluator = evaluator or evaluation.SerialEvaluator(engine)
+    monitor = telemetry.Monitor(engine, history, evaluator)
+    state = checkpoint.restore(engine, evaluator) if checkpoint is not None else None
+    if state is not None:
+        population, fitness, best_schedule, best_makespan, first_generation, no_improvement_count = state
+    else:
+        population = initial_population(engine, engine.population_size)
+        fitness = evaluator.evaluate(population)
+        best_schedule = population[0]
+        best_makespan = fitness[0]
+        first_generation = 0
+        no_improvement_count = 0
+
+    for generation in range(first_generation, engine.generations):
+        # Stop as soon as the best schedule is proven optimal by the lower bound
+        if engine.is_optimal(best_schedule, best_makespan):
+            break
+        population, fitness = next_generation(engine, population, fitness, best_schedule, best_makespan, evaluator)
+        monitor.record(generation, population, fitness)
+        
+        # Check for improvement in best makespan
+        new_makespan = fitness[0]
+        if new_makespan < best_makespan:
+            best_schedule = population[0]
+            best_makespan = new_makespan
+            no_improvement_count = 0
+        else:
+            no_improvement_count += 1
+
+        # Termination condition: Stop if no improvement for a certain number of generations
+        if no_improvement_count >= engine.max_no_improvement:
+            break
+
+        if checkpoint is not None:
+            checkpoint.update(engine, generation, population, fitness, best_schedule, best_makespan,
+                              no_improvement_count, evaluator)
+
+    return best_schedule, best_makespan
+
+# Advanced Genetic Algorithm
+def advanced_genetic_algorithm(engine, evaluator=None, steady_state=False, vectorized=False, local_search=False,
+                               history=None, checkpoint=None):
+    if local_search and (engine.encoding != 'activity_list' or steady_state or vectorized):
+        raise ValueError("The local search needs the activity list encoding and the generational algorithm")
+    if checkpoint is not None and (steady_state or vectorized):
+        raise ValueError("The checkpoints need the generational algorithm")
+    if steady_state:
+        return steadystate.steady_state_genetic_algorithm(engine, evaluator, advanced=True, history=history)
+    if vectorized:
+        from . import vectorized as vectorized_module  # numpy is only needed for this mode
+        return vectorized_module.vectorized_genetic_algorithm(engine, evaluator, advanced=True, history=history)
+    evaluator = evaluator or evaluation.SerialEvaluator(engine)
+    monitor = telemetry.Monitor(engine, history, evaluator)
+    state = checkpoint.restore(engine, evaluator) if checkpoint is not None else None
+    if state is not None:
+        population, fitness, best_schedule, best_makespan, first_generation, no_improvement_count = state
+    else:
+        population = initial_population(engine, engine.population_size)
+        fitness = evaluator.evaluate(population)
+        best_schedule = population[0]
+        best_makespan = fitness[0]
+        first_generation = 0
+        no_improvement_count = 0
+
+    for generation in range(first_generation, engine.generations):
+        # Stop as soon as the best schedule is proven optimal by the lower bound
+        if engine.is_optimal(best_schedule, best_makespan):
+            break
+        population, fitness = next_advanced_generation(engine, population, fitness, evaluator, local_search)
+        monitor.record(generation, population, fitness)
+        
+        # Check for improvement in best makespan
+        new_makespan = fitness[0]
+        if new_makespan < best_makespan:
+            best_schedule = population[0]
+            best_makespan = new_makespan
+            no_improvement_count = 0
+        else:
+            no_improvement_count += 1
+
+        # Termination condition: Stop if no improvement for a certain number of generations
+        if no_improvement_count >= engine.max_no_improvement:
+            break
+
+        if checkpoint is not None:
+            checkpoint.update(engine, generation, population, fitness, best_schedule, best_makespan,
+                              no_improvement_count, evaluator)
+
+    return best_schedule, best_makespan
+
+# Decode the best schedule (a permutation of 1-indexed tasks) into the start time of each task
+def get_start_times(engine, schedule):
+    return serial_schedule([task - 1 for task in schedule], engine.resources, engine.task_duration,
+                           engine.task_resource, engine.task_dependencies)
+
+@profiled
+def genetic_algorithm_schedule(seed, tasks, resources, task_duration, task_resource, task_dependencies, workers=1,
+                               steady_state=False, encoding='permutation', vectorized=False, deduplicate=False,
+                               history=None, checkpoint=None, stats=None, warm_start=None):
+    engine = GeneticEngine((tasks, resources, task_duration, task_resource, task_dependencies), seed, encoding=encoding,
+                           warm_start=warm_start)
+    return engine.solve(False, workers, deduplicate, stats, steady_state=steady_state, vectorized=vectorized,
+                        history=history, checkpoint=checkpoint)
+
+@profiled
+def advanced_genetic_algorithm_schedule(seed, tasks, resources, task_duration, task_resource, task_dependencies, workers=1,
+                                        steady_state=False, encoding='permutation', vectorized=False,
+                                        local_search=False, deduplicate=False, history=None, checkpoint=None,
+                                        stats=None, warm_start=None):
+    engine = GeneticEngine((tasks, resources, task_duration, task_resource, task_dependencies), seed, encoding=encoding,
+                           warm_start=warm_start)
+    return engine.solve(True, workers, deduplicate, stats, steady_state=steady_state, vectorized=vectorized,
+                        local_search=local_search, history=history, checkpoint=checkpoint)
@@ -0,0 +1,183 @@
+import random
+from multiprocessing import Pipe, Process
+
+from ..upmproblems.profiling import profiled
+from . import genetic, selection
+from .evaluation import SerialEvaluator
+
+topologies = ('ring', 'random')
+algorithms = ('basic', 'advanced')
+# Settings of the engine that every island may set on its own, besides the algorithm
+island_parameters = ('population_size', 'initial_mutation_rate', 'encoding', 'selection_method')
+# Encoding of the islands whose settings do not give one
+default_encoding = 'permutation'
+
+
+def check_settings(settings):
+    for island_settings in settings:
+        for name, value in island_settings.items():
+            if name == 'algorithm':
+                if value not in algorithms:
+                    raise ValueError(f"Unknown algorithm {value!r}, expected one of {algorithms}")
+            elif name == 'encoding':
+                if value not in genetic.encodings:
+                    raise ValueError(f"Unknown encoding {value!r}, expected one of {genetic.encodings}")
+            elif name == 'selection_method':
+                if value not in selection.methods:
+                    raise ValueError(f"Unknown selection method {value!r}, expected one of {tuple(selection.methods)}")
+            elif name not in island_parameters:
+                raise ValueError(f"Unknown island setting {name!r}, expected 'algorithm' or one of {island_parameters}")
+    # The migrants must be understood by the island receiving them
+    if len({island_settings['encoding'] for island_settings in settings}) > 1:
+        raise ValueError("All the islands must use the same encoding")
+
+
+# Replace the worst individuals of a population with the migrants received
+def receive_migrants(population, fitness, migrants, migrant_fitness):
+    worst = sorted(range(len(population)), key=fitness.__getitem__)[max(0, len(population) - len(migrants)):]
+    for i, migrant, makespan in zip(worst, migrants, migrant_fitness):
+        population[i] = migrant
+        fitness[i] = makespan
+
+
+def run_island(connection, seed, settings, instance):
+    """
+    Runs one sub-population in its own process. Each message received holds the migrants from the other islands;
+    the island takes them in, evolves for the number of generations asked and answers with its best individuals.
+    A None message ends the process.
+    """
+    algorithm = settings.get('algorithm', 'basic')
+    engine = genetic.GeneticEngine(instance, seed, **{name: settings[name] for name in island_parameters if name in settings})
+    evolve_island(connection, engine, algorithm)
+    connection.close()
+
+
+# Evolve the population of an island between the migrations, until a None message arrives
+def evolve_island(connection, engine, algorithm):
+    evaluator = SerialEvaluator(engine)
+    population = engine.operators.initialize_population(engine, engine.population_size)
+    fitness = evaluator.evaluate(population)
+    best_schedule = population[0]
+    best_makespan = fitness[0]
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        migrants, migrant_fitness, generations, migration_size = message
+        receive_migrants(population, fitness, migrants, migrant_fitness)
+        for generation in range(generations):
+            # The best makespan is checked before every generation so that migrants can become the best schedule
+            best = min(range(len(population)), key=fitness.__getitem__)
+            if fitness[best] < best_makespan:
+                best_schedule = population[best]
+                best_makespan = fitness[best]
+            if algorithm == 'basic':
+                population, fitness = genetic.next_generation(engine, population, fitness, best_schedule, best_makespan,
+                                                              evaluator)
+            else:
+                population, fitness = genetic.next_advanced_generation(engine, population, fitness, evaluator)
+        if fitness[0] < best_makespan:
+            best_schedule = population[0]
+            best_makespan = fitness[0]
+
+        emigrants, emigrant_fitness = genetic.select_best_population(population, fitness, migration_size)
+        connection.send((best_schedule, best_makespan, emigrants, emigrant_fitness))
+
+
+def island_model(seed, tasks, resources, task_duration, task_resource, task_dependencies, islands=4,
+                 migration_interval=5, migration_size=2, topology='ring', settings=None):
+    """
+    Island model of the genetic algorithm: every island evolves its own population in its own process and every
+    migration_interval generations sends copies of its best individuals to other islands, where they replace the
+    worst ones. The seed of every island and the random topology come from the seed, so a seed always gives the
+    same result.
+    :param seed: used to initialize the random number generator
+    :param tasks: number of tasks in the task planning problem with resources
+    :param resources: number of resources in the task planning problem with resources
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param islands: number of islands (and processes)
+    :param migration_interval: number of generations between migrations
+    :param migration_size: number of individuals sent by every island in each migration
+    :param topology: 'ring' (every island sends to the next one) or 'random' (every island sends to a random other one)
+    :param settings: optional list with a dictionary of settings for every island, with the 'algorithm' ('basic' or
+                     'advanced') and values for the population_size, initial_mutation_rate, selection_method and
+                     encoding (the same for every island) of its engine
+    :return: tuple with the best schedule (list of 1-indexed tasks) and its makespan
+    """
+    if topology not in topologies:
+        raise ValueError(f"Unknown topology {topology!r}, expected one of {topologies}")
+    if islands < 1 or migration_interval < 1 or migration_size < 0:
+        raise ValueError("The islands and the migration interval must be positive and the migration size not negative")
+    settings = settings if settings is not None else [{}] * islands
+    if len(settings) != islands:
+        raise ValueError(f"Expected the settings of {islands} islands, got {len(settings)}")
+    settings = [dict(island_settings) for island_settings in settings]
+    for island_settings in settings:
+        island_settings.setdefault('encoding', default_encoding)
+    check_settings(settings)
+
+    rng = random.Random(seed)
+    instance = (tasks, resources, task_duration, task_resource, task_dependencies)
+    # Limits the generations and decides when the best schedule of the islands is proven optimal by the lower bound
+    engine = genetic.GeneticEngine(instance, encoding=settings[0]['encoding'])
+    connections = []
+    processes = []
+    for island in range(islands):
+        parent_connection, child_connection = Pipe()
+        process = Process(target=run_island, args=(child_connection, rng.randrange(2 ** 32), settings[island], instance))
+        process.start()
+        child_connection.close()
+        connections.append(parent_connection)
+        processes.append(process)
+
+    best_schedule = None
+    best_makespan = float('inf')
+    inboxes = [([], []) for _ in range(islands)]
+    no_improvement_count = 0
+    try:
+        generation = 0
+        while generation < engine.generations and no_improvement_count < engine.max_no_improvement:
+            generations = min(migration_interval, engine.generations - generation)
+            for connection, (migrants, migrant_fitness) in zip(connections, inboxes):
+                connection.send((migrants, migrant_fitness, generations, migration_size))
+            results = [connection.recv() for connection in connections]
+            generation += generations
+
+            improved = False
+            for island_best_schedule, island_best_makespan, _, _ in results:
+                if island_best_makespan < best_makespan:
+                    best_schedule, best_makespan = island_best_schedule, island_best_makespan
+                    improved = True
+            no_improvement_count = 0 if improved else no_improvement_count + generations
+            if improved and engine.is_optimal(best_schedule, best_makespan):
+                break
+
+            inboxes = [([], []) for _ in range(islands)]
+            for island, (_, _, emigrants, emigrant_fitness) in enumerate(results):
+                if islands == 1:
+                    break
+                if topology == 'ring':
+                    target = (island + 1) % islands
+                else:
+                    target = rng.choice([other for other in range(islands) if other != island])
+                inboxes[target][0].extend(emigrants)
+                inboxes[target][1].extend(emigrant_fitness)
+    finally:
+        for connection in connections:
+            connection.send(None)
+            connection.close()
+        for process in processes:
+            process.join()
+
+    return best_schedule, best_makespan
+
+
+@profiled
+def island_model_schedule(seed, tasks, resources, task_duration, task_resource, task_dependencies, **options):
+    best_schedule, makespan = island_model(seed, tasks, resources, task_duration, task_resource, task_dependencies, **options)
+    encoding = (options.get('settings') or [{}])[0].get('encoding', default_encoding)
+    engine = genetic.GeneticEngine((tasks, resources, task_duration, task_resource, task_dependencies), encoding=encoding)
+    return engine.get_start_times(best_schedule)
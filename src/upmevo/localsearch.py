@@ -0,0 +1,236 @@
+import time
+from array import array
+from collections import OrderedDict
+
+from . import activitylist, genetic
+
+
+class ListDecoder:
+    """
+    Serial schedule generation scheme for activity lists (0-indexed tasks) that respect the dependencies, so the tasks
+    are scheduled in list order. The resource usage before every position of the last list decoded is kept, so a list
+    that only differs from it from some position on is decoded from there.
+    :param resources: capacity of the renewable resource
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param predecessors: list with the (0-indexed) predecessors of every task
+    :param max_local_optima: number of lists found to be local optima that are remembered, the least recently seen
+                             ones are forgotten first
+    """
+    def __init__(self, resources, task_duration, task_resource, predecessors, max_local_optima=1000):
+        self.resources = resources
+        self.task_duration = task_duration
+        self.task_resource = task_resource
+        self.predecessors = predecessors
+        # No task of a serial schedule starts after all the tasks before it in the list have ended
+        self.horizon = sum(task_duration)
+        self.order = []
+        self.start_times = [0] * len(task_duration)
+        self.profiles = []  # Resource usage before every position of the list
+        self.makespans = []  # Makespan of the tasks before every position of the list
+        self.local_optima = OrderedDict()  # Lists whose whole neighbourhood has been evaluated without improvement
+        self.max_local_optima = max_local_optima
+
+    def schedule(self, task, start_times, usage):
+        duration = self.task_duration[task]
+        demand = self.task_resource[task]
+        if demand > self.resources:
+            raise ValueError(f"Task {task + 1} requires {demand} resources but only {self.resources} are available")
+        available = self.resources - demand
+        start = max((start_times[pre] + self.task_duration[pre] for pre in self.predecessors[task]), default=0)
+        time = start
+        while time < start + duration:
+            if usage[time] > available:
+                start = time + 1
+            time += 1
+        for time in range(start, start + duration):
+            usage[time] += demand
+        start_times[task] = start
+        return start + duration
+
+    def decode(self, order, position=0):
+        """
+        Decodes a list that shares the tasks before the position with the last list decoded and keeps its state
+        :return: makespan of the schedule
+        """
+        if position == 0:
+            self.profiles = [array('i', [0]) * self.horizon]
+            self.makespans = [0]
+        del self.profiles[position + 1:]
+        del self.makespans[position + 1:]
+        self.order = list(order)
+        usage = self.profiles[position][:]
+        makespan = self.makespans[position]
+        for task in order[position:]:
+            makespan = max(makespan, self.schedule(task, self.start_times, usage))
+            self.profiles.append(usage[:])
+            self.makespans.append(makespan)
+        return makespan
+
+    def evaluate(self, order, position):
+        """
+        Makespan of a list that shares the tasks before the position with the last list decoded, which is kept
+        """
+        start_times = list(self.start_times)
+        usage = self.profiles[position][:]
+        makespan = self.makespans[position]
+        for task in order[position:]:
+            makespan = max(makespan, self.schedule(task, start_times, usage))
+        return makespan
+
+    def is_local_optimum(self, order):
+        if order not in self.local_optima:
+            return False
+        self.local_optima.move_to_end(order)
+        return True
+
+    def add_local_optimum(self, order):
+        self.local_optima[order] = None
+        self.local_optima.move_to_end(order)
+        if len(self.local_optima) > self.max_local_optima:
+            self.local_optima.popitem(last=False)
+
+    def critical_tasks(self):
+        # Tasks that end at the makespan, and backwards every task that ends exactly when a critical task starts
+        # (because of a dependency or of the resource), so that moving it earlier is the only way to shorten the chain
+        start_times = self.start_times
+        ends = sorted(((start_times[task] + self.task_duration[task], task) for task in self.order), reverse=True)
+        makespan = self.makespans[-1]
+        critical = set()
+        critical_starts = set()
+        for end, task in ends:
+            if end == makespan or end in critical_starts:
+                critical.add(task)
+                critical_starts.add(start_times[task])
+        return critical
+
+
+class Budget:
+    """
+    Limits on the number of evaluations and on the time in seconds of a search, None for no limit
+    """
+    def __init__(self, max_evaluations=None, time_limit=None):
+        if max_evaluations is None and time_limit is None:
+            raise ValueError("A search needs a limit on the evaluations or on the time")
+        self.max_evaluations = max_evaluations
+        self.time_limit = time_limit
+        self.start = time.perf_counter()
+        self.evaluations = 0
+
+    def spend(self):
+        self.evaluations += 1
+
+    def exhausted(self):
+        return self.progress() >= 1
+
+    # Fraction of the budget spent, by the evaluations or by the time, whichever is closer to its limit
+    def progress(self):
+        progress = 0.0
+        if self.max_evaluations is not None:
+            progress = self.evaluations / self.max_evaluations if self.max_evaluations else 1.0
+        if self.time_limit is not None:
+            elapsed = time.perf_counter() - self.start
+            progress = max(progress, elapsed / self.time_limit if self.time_limit else 1.0)
+        return progress
+
+
+# Decoder of the instance of the engine, kept by the engine with the lists found to be local optima
+def get_decoder(engine):
+    if 'decoder' not in engine.cache:
+        predecessors, _ = activitylist.get_precedence(engine)
+        engine.cache['decoder'] = ListDecoder(engine.resources, engine.task_duration, engine.task_resource, predecessors)
+    return engine.cache['decoder']
+
+
+# Moves of a list that take a critical task to an earlier position, inserted before another task or swapped with
+# it, as (position of the task, target position, whether it is a swap). Every move respects the dependencies.
+def critical_moves(order, critical, successors, predecessors):
+    position = {task: index for index, task in enumerate(order)}
+    for task in sorted(critical, key=position.__getitem__):
+        index = position[task]
+        first = max((position[pre] + 1 for pre in predecessors[task]), default=0)
+        for target in range(index - 1, first - 1, -1):
+            yield index, target, False
+            # The other task moves to the old position of the critical task, after every task in between
+            if all(position[suc] > index for suc in successors[order[target]]):
+                yield index, target, True
+
+
+# Random move of any task to another position between its last predecessor and its first successor, None if the
+# list has no such move after a few tries
+def random_move(engine, order, successors, predecessors, tries=10):
+    position = {task: index for index, task in enumerate(order)}
+    rng = engine.rng
+    for _ in range(tries):
+        index = rng.randrange(len(order))
+        task = order[index]
+        first = max((position[pre] + 1 for pre in predecessors[task]), default=0)
+        last = min((position[suc] - 1 for suc in successors[task]), default=len(order) - 1)
+        if first < last:
+            target = rng.randint(first, last - 1)
+            return index, target if target < index else target + 1, False
+    return None
+
+
+# Apply a move to a list, returns the neighbour and the first position that changes
+def apply_move(order, move):
+    index, target, swap = move
+    task = order[index]
+    if swap:
+        neighbour = list(order)
+        neighbour[target], neighbour[index] = task, order[target]
+        return neighbour, min(index, target)
+    if target < index:
+        return order[:target] + [task] + order[target:index] + order[index + 1:], target
+    return order[:index] + order[index + 1:target + 1] + [task] + order[target + 1:], index
+
+
+def neighbours(order, critical, successors, predecessors):
+    for move in critical_moves(order, critical, successors, predecessors):
+        yield apply_move(order, move)
+
+
+def improve(engine, activity_list, decoder=None):
+    """
+    First improvement local search with insert and swap moves of the critical tasks, which evaluates at most the
+    local search evaluations of the engine
+    :param engine: GeneticEngine with the instance of the list
+    :param activity_list: list of (1-indexed) tasks that respects the dependencies
+    :param decoder: ListDecoder of the instance of the engine, by default the one kept by get_decoder
+    :return: tuple with the best list found and its makespan
+    """
+    decoder = decoder or get_decoder(engine)
+    max_evaluations = engine.local_search_evaluations
+    predecessors, successors = activitylist.get_precedence(engine)
+    order = [task - 1 for task in activity_list]
+    makespan = decoder.decode(order)
+    if decoder.is_local_optimum(tuple(order)):
+        return list(activity_list), makespan
+    evaluations = 0
+    while evaluations < max_evaluations:
+        for neighbour, position in neighbours(order, decoder.critical_tasks(), successors, predecessors):
+            evaluations += 1
+            if decoder.evaluate(neighbour, position) < makespan:
+                order = neighbour
+                makespan = decoder.decode(order, position)
+                break
+            if evaluations >= max_evaluations:
+                break
+        else:
+            # No neighbour is better, the search is not repeated when the list is in the elite again
+            decoder.add_local_optimum(tuple(order))
+            break
+    return [task + 1 for task in order], makespan
+
+
+def improve_elite(engine, population, fitness, elite_size):
+    """
+    Improves the first elite_size individuals of a population sorted by makespan with the local search
+    :return: the population and its makespans, sorted again
+    """
+    decoder = get_decoder(engine)
+    population = list(population)
+    fitness = list(fitness)
+    for i in range(min(elite_size, len(population))):
+        population[i], fitness[i] = improve(engine, population[i], decoder)
+    return genetic.select_best_population(population, fitness, len(population))
@@ -0,0 +1,165 @@
+import time
+from multiprocessing import Event, Pipe, Process, Value
+from multiprocessing.connection import wait
+
+from ..upmproblems.profiling import profiled
+from ..upmproblems.schedule import get_makespan, serial_schedule
+from ..upmsearch import bounds
+from ..upmsearch.astar import rcpsp_a_star
+from ..upmsearch.branchandbound import build_problem, rcpsp_branch_and_bound, share_incumbent
+from . import activitylist, genetic, telemetry
+
+solver_names = ('branch_and_bound', 'a_star', 'genetic', 'priority_rule')
+# Settings of the engine of the genetic algorithm, which restarts with a new population whenever a run ends
+genetic_settings = {'encoding': 'activity_list'}
+# Seconds the solvers have to stop and send their last schedule once the portfolio is cancelled
+cancel_timeout = 5.0
+
+
+class Cancelled(Exception):
+    pass
+
+
+def run_exact(search, instance, incumbent, stop, connection):
+    # An exact search that runs out of nodes proves that no schedule is shorter than the incumbent
+    tasks_list, resource_constraints, precedence_constraints = build_problem(*instance[1:])
+    stats = {}
+    best_schedule = search(tasks_list, resource_constraints, precedence_constraints, stats=stats, propagation=True,
+                           incumbent=incumbent, stop=stop)
+    if best_schedule is not None:
+        connection.send(('schedule', best_schedule.start_times))
+    connection.send(('done', not stats['cancelled']))
+
+
+def run_genetic(instance, seed, lower_bound, incumbent, stop, connection):
+    def check(record):
+        if stop.is_set():
+            raise Cancelled
+
+    engine = genetic.GeneticEngine(instance, seed, **genetic_settings)
+    engine.cache['lower_bound'] = lower_bound  # Computed once by the portfolio
+    try:
+        while True:
+            engine.mutation_rate = engine.initial_mutation_rate
+            best_schedule, _ = engine.run(advanced=True, history=telemetry.Callback(check))
+            start_times = engine.get_start_times(best_schedule)
+            if share_incumbent(incumbent, get_makespan(start_times, engine.task_duration)):
+                connection.send(('schedule', start_times))
+            if engine.is_optimal(best_schedule, get_makespan(start_times, engine.task_duration)):
+                break
+    except Cancelled:
+        pass
+    connection.send(('done', False))
+
+
+def run_priority_rule(instance, incumbent, connection):
+    # Serial schedule of the tasks ordered by the longest chain of durations that follows them
+    engine = genetic.GeneticEngine(instance)
+    order = [task - 1 for task in activitylist.longest_tail_activity_list(engine)]
+    start_times = serial_schedule(order, *instance[1:])
+    if share_incumbent(incumbent, get_makespan(start_times, engine.task_duration)):
+        connection.send(('schedule', start_times))
+    connection.send(('done', False))
+
+
+def run_solver(name, instance, seed, lower_bound, incumbent, stop, connection):
+    try:
+        if name == 'branch_and_bound':
+            run_exact(rcpsp_branch_and_bound, instance, incumbent, stop, connection)
+        elif name == 'a_star':
+            run_exact(rcpsp_a_star, instance, incumbent, stop, connection)
+        elif name == 'genetic':
+            run_genetic(instance, seed, lower_bound, incumbent, stop, connection)
+        else:
+            run_priority_rule(instance, incumbent, connection)
+    finally:
+        connection.close()
+
+
+@profiled
+def solve(tasks, resources, task_duration, task_resource, task_dependencies, time_limit=10.0, seed=None,
+          solvers=solver_names, stats=None):
+    """
+    Races the branch and bound, the A* search, the genetic algorithm and the priority rule in parallel processes.
+    The solvers share the makespan of the best schedule found (the incumbent), so that the exact searches only look
+    for shorter schedules. All of them are cancelled as soon as the best schedule is proven optimal, because it
+    reaches the lower bound or an exact search finds nothing shorter, or when the time limit expires.
+    :param tasks: number of tasks in the task planning problem with resources
+    :param resources: number of resources in the task planning problem with resources
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param time_limit: maximum time in seconds, including the lower bound
+    :param seed: seed of the genetic algorithm
+    :param solvers: names of the solvers raced, from solver_names
+    :param stats: optional dictionary that receives the makespan found, the lower bound, whether the schedule is
+                  proven optimal, the optimality gap, the solver that found the schedule and the time taken
+    :return: list with the start time of each task in the best schedule found, or empty list if none was found
+    """
+    for name in solvers:
+        if name not in solver_names:
+            raise ValueError(f"Unknown solver {name!r}, expected one of {solver_names}")
+    if tasks == 0:
+        return []
+    start = time.perf_counter()
+    deadline = start + time_limit
+    instance = (tasks, resources, task_duration, task_resource, task_dependencies)
+    lower_bound = bounds.lower_bound(*instance)
+
+    # No schedule is longer than running the tasks one after another
+    incumbent = Value('i', sum(task_duration) + 1)
+    stop = Event()
+    connections = {}
+    processes = []
+    for name in solvers:
+        parent_connection, child_connection = Pipe(duplex=False)
+        process = Process(target=run_solver,
+                          args=(name, instance, seed, lower_bound, incumbent, stop, child_connection))
+        process.start()
+        child_connection.close()
+        connections[parent_connection] = name
+        processes.append(process)
+
+    best_start_times = []
+    best_makespan = None
+    winner = None
+    proven = False
+    try:
+        while connections:
+            timeout = deadline - time.perf_counter() if not stop.is_set() else cancel_timeout
+            ready = wait(list(connections), timeout=max(timeout, 0))
+            if not ready:
+                if stop.is_set():
+                    break  # The solvers left are terminated
+                stop.set()
+                continue
+            for connection in ready:
+                try:
+                    message, value = connection.recv()
+                except EOFError:
+                    del connections[connection]
+                    continue
+                if message == 'schedule':
+                    makespan = get_makespan(value, task_duration)
+                    if best_makespan is None or makespan < best_makespan:
+                        best_start_times, best_makespan, winner = value, makespan, connections[connection]
+                        proven = proven or makespan <= lower_bound
+                elif value:
+                    proven = True  # An exact search ran out of schedules shorter than the incumbent
+                if proven:
+                    stop.set()
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(cancel_timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for connection in connections:
+            connection.close()
+
+    if stats is not None and best_makespan is not None:
+        # A schedule proven optimal by an exact search is itself a lower bound
+        stats.update(bounds.optimality_report(best_makespan, best_makespan if proven else lower_bound))
+        stats.update(winner=winner, time=time.perf_counter() - start)
+    return best_start_times
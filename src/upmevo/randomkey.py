@@ -0,0 +1,77 @@
+from ..upmproblems.schedule import get_makespan, serial_schedule
+
+try:
+    import numpy as np
+except ImportError:  # Without numpy the keys are lists of floats, with the same values and the same decoding
+    np = None
+
+
+# Vector of keys of an individual: a numpy array of floats when numpy is installed, a list otherwise. The values are
+# always drawn from the generator of the engine, so a seed gives the same run with and without numpy.
+def as_keys(values):
+    return np.array(values, dtype=float) if np is not None else list(values)
+
+
+# Initialize a population of random key vectors, one priority in [0, 1) for every task
+def initialize_population(engine, population_size):
+    rng = engine.rng
+    return [as_keys([rng.random() for _ in range(engine.tasks)]) for _ in range(population_size)]
+
+
+# Uniform crossover: every key of a child comes from one of the parents, the other child takes the other key.
+# Any vector of keys is a valid individual, so no repair is needed. A child takes each key from its first parent
+# with the crossover bias of the engine.
+def crossover(engine, parent1, parent2):
+    rng = engine.rng
+    from_first = [rng.random() < engine.crossover_bias for _ in range(len(parent1))]
+    if np is not None:
+        return np.where(from_first, parent1, parent2), np.where(from_first, parent2, parent1)
+    child1 = []
+    child2 = []
+    for first, key1, key2 in zip(from_first, parent1, parent2):
+        if first:
+            child1.append(key1)
+            child2.append(key2)
+        else:
+            child1.append(key2)
+            child2.append(key1)
+    return child1, child2
+
+
+# Mutation: draw a new priority for a random task
+def mutate(engine, keys):
+    rng = engine.rng
+    if rng.random() < engine.mutation_rate and engine.tasks > 0:
+        keys[rng.randrange(engine.tasks)] = rng.random()
+    return keys
+
+
+# Tasks (0-indexed) ordered by priority, the lowest key goes first and equal keys keep the order of the tasks
+def get_task_order(keys):
+    if np is not None:
+        return np.argsort(keys, kind='stable').tolist()
+    return sorted(range(len(keys)), key=keys.__getitem__)
+
+
+# Task orders of a batch of key vectors, ordered with a single argsort of the whole batch when numpy is installed
+def get_task_orders(population):
+    if np is not None and len(population) > 0:
+        return np.argsort(np.asarray(population, dtype=float), axis=1, kind='stable').tolist()
+    return [get_task_order(keys) for keys in population]
+
+
+# Decode the keys with the serial schedule generation scheme, which only takes a task once its predecessors are
+# scheduled, so the order does not need to respect the dependencies
+def get_start_times(engine, keys):
+    return serial_schedule(get_task_order(keys), engine.resources, engine.task_duration, engine.task_resource,
+                           engine.task_dependencies)
+
+
+# Start times of every key vector of a batch, decoded from the task orders of the whole batch
+def decode_population(engine, population):
+    return [serial_schedule(order, engine.resources, engine.task_duration, engine.task_resource,
+                            engine.task_dependencies) for order in get_task_orders(population)]
+
+
+def calculate_makespan(engine, keys):
+    return get_makespan(get_start_times(engine, keys), engine.task_duration)
@@ -0,0 +1,57 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+
+# Selection: Tournament selection of count parents, every tournament takes the best of k random individuals
+def tournament(engine, fitness, count, k=5):
+    k = min(k, len(fitness))
+    rng = engine.rng
+    return [min(rng.sample(range(len(fitness)), k), key=fitness.__getitem__) for _ in range(count)]
+
+
+# Linear ranking weights, from the rank pressure for the best individual down to 2 - rank_pressure for the worst.
+# The rank pressure is the expected number of copies of the best individual, between 1 and 2.
+def rank_weights(size, rank_pressure):
+    if size == 1:
+        return [1.0]
+    return [rank_pressure - (2 * rank_pressure - 2) * rank / (size - 1) for rank in range(size)]
+
+
+# Selection: Rank selection, the probability of every individual only depends on its position in the ranking
+def rank(engine, fitness, count):
+    ranking = sorted(range(len(fitness)), key=fitness.__getitem__)
+    weights = rank_weights(len(fitness), engine.rank_pressure)
+    return engine.rng.choices(ranking, cum_weights=list(accumulate(weights)), k=count)
+
+
+# Selection: Stochastic universal sampling, count equally spaced pointers over the weights of the individuals. The
+# weight of a schedule is how much shorter it is than the worst one (plus one, so that the worst can be chosen).
+def stochastic_universal_sampling(engine, fitness, count):
+    worst = max(fitness)
+    cumulative = list(accumulate(worst - makespan + 1 for makespan in fitness))
+    step = cumulative[-1] / count
+    rng = engine.rng
+    start = rng.uniform(0, step)
+    selected = [min(bisect_right(cumulative, start + i * step), len(fitness) - 1) for i in range(count)]
+    # The pointers select the individuals in population order, they are shuffled so that the pairs are random
+    rng.shuffle(selected)
+    return selected
+
+
+methods = {
+    'tournament': tournament,
+    'rank': rank,
+    'sus': stochastic_universal_sampling,
+}
+
+
+def select_parents(engine, fitness, count):
+    """
+    Selects the parents of a whole generation from the makespans of the population, without decoding any schedule
+    :param engine: GeneticEngine whose selection method ('tournament', 'rank' or 'sus', stochastic universal
+                   sampling) and random number generator are used
+    :param fitness: list with the makespan of every individual of the population
+    :param count: number of parents to select
+    :return: list with the positions of the selected individuals in the population
+    """
+    return methods[engine.selection_method](engine, fitness, count)
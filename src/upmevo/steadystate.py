@@ -0,0 +1,118 @@
+import heapq
+from collections import Counter
+from itertools import count
+
+from . import diversity, evaluation, genetic, telemetry
+
+
+class SteadyStatePopulation:
+    """
+    Population kept in a heap with the worst individual on top, so that an offspring replaces it in O(log n).
+    Ties are broken in favour of the oldest individual, which leaves first. The parents are chosen by tournament
+    on random positions of the heap, so the cost of every offspring does not depend on the population size.
+    :param engine: GeneticEngine whose random number generator chooses the parents
+    :param population: list of schedules
+    :param fitness: list with the makespan of every schedule
+    :param evaluator: with a DeduplicatingEvaluator, no offspring enters if its genotype or its decoded schedule
+                      is already in the population
+    """
+    def __init__(self, engine, population, fitness, evaluator=None):
+        self.engine = engine
+        self.counter = count()
+        self.heap = [(-makespan, next(self.counter), schedule) for schedule, makespan in zip(population, fitness)]
+        heapq.heapify(self.heap)
+        best = min(range(len(population)), key=fitness.__getitem__)
+        self.best_schedule = population[best]
+        self.best_makespan = fitness[best]
+        self.evaluator = evaluator if isinstance(evaluator, diversity.DeduplicatingEvaluator) else None
+        self.keys = Counter()
+        if self.evaluator:
+            for schedule in population:
+                self.keys.update(self.get_keys(schedule))
+
+    def get_keys(self, schedule):
+        return [('genotype', diversity.genotype_key(schedule)), ('phenotype', self.evaluator.phenotype_key(schedule))]
+
+    def get_population(self):
+        return [schedule for _, _, schedule in self.heap], [-makespan for makespan, _, _ in self.heap]
+
+    def select(self, k=5):
+        # Populations smaller than the tournament take part in it whole, as in selection.tournament
+        selected = self.engine.rng.sample(range(len(self.heap)), min(k, len(self.heap)))
+        return self.heap[min(selected, key=lambda i: -self.heap[i][0])][2]
+
+    def insert(self, schedule, makespan):
+        # Offspring that are not better than the worst individual are discarded
+        if makespan >= -self.heap[0][0]:
+            return False
+        if self.evaluator:
+            keys = self.get_keys(schedule)
+            if any(key in self.keys for key in keys):
+                return False
+            for key in self.get_keys(self.heap[0][2]):
+                self.keys[key] -= 1
+                if not self.keys[key]:
+                    del self.keys[key]
+            self.keys.update(keys)
+        heapq.heapreplace(self.heap, (-makespan, next(self.counter), schedule))
+        if makespan < self.best_makespan:
+            self.best_schedule = schedule
+            self.best_makespan = makespan
+        return True
+
+
+def steady_state_genetic_algorithm(engine, evaluator=None, advanced=False, offspring=2, history=None):
+    """
+    Steady state version of the genetic algorithms: instead of building a new population every generation, a few
+    offspring at a time replace the worst individuals. A generation counts population_size offspring, so the
+    termination condition and the decrease of the mutation rate of the advanced algorithm keep their meaning.
+    :param engine: GeneticEngine with the instance and the settings of the run
+    :param evaluator: evaluator of the makespans, SerialEvaluator by default
+    :param advanced: whether the mutation rate decreases over time as in the advanced genetic algorithm
+    :param offspring: number of offspring created and evaluated together, rounded up to an even number
+    :param history: optional list or telemetry sink that receives the record of every generation
+    :return: tuple with the best schedule and its makespan
+    """
+    evaluator = evaluator or evaluation.SerialEvaluator(engine)
+    monitor = telemetry.Monitor(engine, history, evaluator)
+    operators = engine.operators
+    population = genetic.initial_population(engine, engine.population_size)
+    fitness = evaluator.evaluate(population)
+    if isinstance(evaluator, diversity.DeduplicatingEvaluator):
+        population, fitness = diversity.select_unique_population(engine, population, fitness, engine.population_size,
+                                                                 evaluator)
+    ordered = SteadyStatePopulation(engine, population, fitness, evaluator)
+    best_makespan = ordered.best_makespan
+    no_improvement_count = 0
+    pairs = max(1, (offspring + 1) // 2)
+
+    for generation in range(engine.generations):
+        # Stop as soon as the best schedule is proven optimal by the lower bound
+        if engine.is_optimal(ordered.best_schedule, ordered.best_makespan):
+            break
+        for _ in range(max(1, engine.population_size // (2 * pairs))):
+            children = []
+            for _ in range(pairs):
+                child1, child2 = operators.crossover(engine, ordered.select(), ordered.select())
+                children.extend([operators.mutate(engine, child1), operators.mutate(engine, child2)])
+            for child, makespan in zip(children, evaluator.evaluate(children)):
+                ordered.insert(child, makespan)
+        if history is not None:
+            monitor.record(generation, *ordered.get_population())
+
+        # Check for improvement in best makespan
+        if ordered.best_makespan < best_makespan:
+            best_makespan = ordered.best_makespan
+            no_improvement_count = 0
+        else:
+            no_improvement_count += 1
+
+        # Decrease mutation rate over time
+        if advanced:
+            engine.mutation_rate = max(0.05, engine.mutation_rate * 0.95)
+
+        # Termination condition: Stop if no improvement for a certain number of generations
+        if no_improvement_count >= engine.max_no_improvement:
+            break
+
+    return ordered.best_schedule, ordered.best_makespan
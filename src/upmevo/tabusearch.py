@@ -0,0 +1,93 @@
+from ..upmproblems.profiling import profiled
+from ..upmsearch import bounds
+from . import activitylist, genetic, localsearch
+
+
+def tabu_search(engine, budget, tenure=7, neighbourhood_size=50):
+    """
+    Tabu search over activity lists of the instance of the engine. Every iteration moves a critical
+    task to the best position among a sample of its earlier positions, even if the schedule gets longer. A task that
+    has just been moved stays tabu for tenure iterations, unless moving it gives a schedule shorter than the best one
+    found (aspiration criterion).
+    :param engine: GeneticEngine with the instance and the random number generator of the search
+    :param budget: localsearch.Budget with the limits of the search
+    :param tenure: number of iterations a moved task stays tabu
+    :param neighbourhood_size: maximum number of moves evaluated in every iteration
+    :return: tuple with the best activity list found and its makespan
+    """
+    decoder = localsearch.get_decoder(engine)
+    predecessors, successors = activitylist.get_precedence(engine)
+    order = [task - 1 for task in activitylist.longest_tail_activity_list(engine)]
+    makespan = decoder.decode(order)
+    best_order, best_makespan = order, makespan
+    tabu_until = [0] * engine.tasks
+    iteration = 0
+
+    lower_bound = engine.lower_bound
+
+    while not budget.exhausted() and best_makespan > lower_bound:
+        iteration += 1
+        moves = list(localsearch.critical_moves(order, decoder.critical_tasks(), successors, predecessors))
+        if len(moves) > neighbourhood_size:
+            moves = engine.rng.sample(moves, neighbourhood_size)
+
+        chosen = None
+        for move in moves:
+            neighbour, position = localsearch.apply_move(order, move)
+            neighbour_makespan = decoder.evaluate(neighbour, position)
+            budget.spend()
+            task = order[move[0]]
+            if tabu_until[task] >= iteration and neighbour_makespan >= best_makespan:
+                continue
+            if chosen is None or neighbour_makespan < chosen[0]:
+                chosen = (neighbour_makespan, neighbour, position, task)
+            if budget.exhausted():
+                break
+
+        if chosen is None:
+            # Every critical move is tabu or there is none, a random move keeps the search going
+            move = localsearch.random_move(engine, order, successors, predecessors)
+            if move is None:
+                break
+            neighbour, position = localsearch.apply_move(order, move)
+            budget.spend()
+            chosen = (decoder.evaluate(neighbour, position), neighbour, position, order[move[0]])
+
+        makespan, order, position, task = chosen
+        decoder.decode(order, position)
+        tabu_until[task] = iteration + tenure
+        if makespan < best_makespan:
+            best_order, best_makespan = order, makespan
+
+    return [task + 1 for task in best_order], best_makespan
+
+
+@profiled
+def tabu_search_schedule(seed, tasks, resources, task_duration, task_resource, task_dependencies, max_evaluations=5000,
+                         time_limit=None, tenure=7, neighbourhood_size=50, stats=None):
+    """
+    Returns the best solution found by the tabu search
+    :param seed: used to initialize the random number generator
+    :param tasks: number of tasks in the task planning problem with resources
+    :param resources: number of resources in the task planning problem with resources
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param max_evaluations: maximum number of schedules evaluated, None for no limit
+    :param time_limit: maximum time of the search in seconds, None for no limit
+    :param tenure: number of iterations a moved task stays tabu
+    :param neighbourhood_size: maximum number of moves evaluated in every iteration
+    :param stats: optional dictionary that receives the number of evaluations, the makespan found, the lower bound,
+                  whether the schedule is proven optimal and the optimality gap
+    :return: list with the start time of each task in the best solution found, or empty list if no solution was found
+    """
+    if tasks == 0:
+        return []
+    engine = genetic.GeneticEngine((tasks, resources, task_duration, task_resource, task_dependencies), seed)
+    lower_bound = engine.lower_bound  # Computed before the budget starts, so the search keeps all its time
+    budget = localsearch.Budget(max_evaluations, time_limit)
+    best_order, makespan = tabu_search(engine, budget, tenure, neighbourhood_size)
+    if stats is not None:
+        stats['evaluations'] = budget.evaluations
+        stats.update(bounds.optimality_report(makespan, lower_bound))
+    return engine.get_start_times(best_order)
@@ -0,0 +1,133 @@
+import csv
+import json
+import statistics
+import time
+from abc import ABC, abstractmethod
+
+from . import diversity
+
+# Columns of the record of every generation, in the order written by the CSV sink
+fields = ('generation', 'best', 'mean', 'worst', 'unique_genotypes', 'unique_phenotypes', 'distance_to_best',
+          'makespan_deviation', 'mutation_rate', 'evaluations', 'evaluations_per_second', 'cache_hit_rate',
+          'wall_time')
+
+
+class Monitor:
+    """
+    Builds the record of every generation of a run of a genetic algorithm and appends it to the history
+    :param engine: GeneticEngine of the run, its mutation rate is reported
+    :param history: list, or sink with an append method, that receives a dictionary per generation; None records nothing
+    :param evaluator: evaluator of the run, its evaluations (and cache hits with a DeduplicatingEvaluator) are reported
+    """
+    def __init__(self, engine, history, evaluator):
+        self.engine = engine
+        self.history = history
+        self.evaluator = evaluator
+        self.start = self.last_time = time.perf_counter()
+        self.last_evaluations = 0
+
+    def record(self, generation, population, fitness):
+        if self.history is None:
+            return
+        now = time.perf_counter()
+        evaluations = getattr(self.evaluator, 'evaluations', 0)
+        record = dict(generation=generation, best=min(fitness), mean=statistics.fmean(fitness), worst=max(fitness))
+        record.update(diversity.diversity_metrics(population, fitness, self.evaluator,
+                                                  self.engine.encoding))
+        record.update(
+            mutation_rate=self.engine.mutation_rate,
+            evaluations=evaluations,
+            evaluations_per_second=(evaluations - self.last_evaluations) / max(now - self.last_time, 1e-9),
+            cache_hit_rate=None,
+            wall_time=now - self.start,
+        )
+        if isinstance(self.evaluator, diversity.DeduplicatingEvaluator):
+            lookups = self.evaluator.hits + self.evaluator.misses
+            record['cache_hit_rate'] = self.evaluator.hits / lookups if lookups else 0.0
+        self.history.append(record)
+        # The time spent on the record is not counted in the rate of the next generation
+        self.last_time = time.perf_counter()
+        self.last_evaluations = evaluations
+
+
+class Callback:
+    """
+    Sink that calls a function with the record of every generation
+    """
+    def __init__(self, function):
+        self.function = function
+
+    def append(self, record):
+        self.function(record)
+
+    def close(self):
+        pass
+
+
+class Tee:
+    """
+    Sink that appends every record to several histories or sinks
+    """
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def append(self, record):
+        for sink in self.sinks:
+            sink.append(record)
+
+    def close(self):
+        for sink in self.sinks:
+            if hasattr(sink, 'close'):
+                sink.close()
+
+
+class FileSink(ABC):
+    """
+    Sink that writes the records to a file in batches, so a run does not wait on the disk every generation. The
+    records still in the buffer are written by flush and by close. Subclasses write a batch of records in write.
+    :param path: path of the file, it is overwritten
+    :param batch_size: number of records written together
+    """
+    def __init__(self, path, batch_size=20):
+        self.file = open(path, 'w', newline='')
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def append(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.write(self.buffer)
+        self.buffer = []
+        self.file.flush()
+
+    @abstractmethod
+    def write(self, records):
+        pass
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class CSVSink(FileSink):
+    """
+    Writes the records as the rows of a CSV file with a header line
+    """
+    def __init__(self, path, batch_size=20):
+        super().__init__(path, batch_size)
+        self.writer = csv.DictWriter(self.file, fieldnames=fields)
+        self.writer.writeheader()
+
+    def write(self, records):
+        self.writer.writerows(records)
+
+
+class JSONLSink(FileSink):
+    """
+    Writes every record as a JSON object on its own line
+    """
+    def write(self, records):
+        self.file.writelines(json.dumps(record) + '\n' for record in records)
@@ -0,0 +1,290 @@
+import numpy as np
+
+from . import activitylist, diversity, evaluation, genetic, selection, telemetry
+
+# The operators take the engine of the run and the numpy generator seeded from the generator of the engine
+
+
+# Population of random permutations of the (1-indexed) tasks, one per row
+def initialize_population(engine, rng, population_size):
+    return rng.permuted(np.tile(np.arange(1, engine.tasks + 1), (population_size, 1)), axis=1)
+
+
+# Tournament selection of count individuals at once, returns their rows in the population
+def tournament_selection(engine, rng, fitness, count, k=5):
+    candidates = rng.integers(0, len(fitness), size=(count, k))
+    return candidates[np.arange(count), np.argmin(fitness[candidates], axis=1)]
+
+
+# Rank selection of count individuals at once, with the weights of selection.rank
+def rank_selection(engine, rng, fitness, count):
+    ranking = np.argsort(fitness, kind='stable')
+    weights = np.array(selection.rank_weights(len(fitness), engine.rank_pressure))
+    return rng.choice(ranking, size=count, p=weights / weights.sum())
+
+
+# Stochastic universal sampling of count individuals at once, with the weights of selection.stochastic_universal_sampling
+def stochastic_universal_sampling(engine, rng, fitness, count):
+    cumulative = np.cumsum(fitness.max() - fitness + 1)
+    step = cumulative[-1] / count
+    pointers = rng.uniform(0, step) + step * np.arange(count)
+    selected = np.minimum(np.searchsorted(cumulative, pointers, side='right'), len(fitness) - 1)
+    return rng.permutation(selected)
+
+
+selection_methods = {
+    'tournament': tournament_selection,
+    'rank': rank_selection,
+    'sus': stochastic_universal_sampling,
+}
+
+
+def crossover_children(parents1, parents2, point1, point2):
+    # Each child takes the segment [point1, point2) of parents2 and the other tasks in the order of parents1
+    count, tasks = parents1.shape
+    rows = np.arange(count)[:, None]
+    columns = np.arange(tasks)
+    in_segment = (columns >= point1[:, None]) & (columns < point2[:, None])
+    segment_tasks = np.zeros((count, tasks + 1), dtype=bool)
+    np.put_along_axis(segment_tasks, parents2, in_segment, axis=1)
+    kept = ~np.take_along_axis(segment_tasks, parents1, axis=1)
+    rank = np.cumsum(kept, axis=1) - 1
+    position = rank + (rank >= point1[:, None]) * (point2 - point1)[:, None]
+    children = np.where(in_segment, parents2, 0)
+    children[np.broadcast_to(rows, kept.shape)[kept], position[kept]] = parents1[kept]
+    return children
+
+
+# Two-point crossover of every pair of parents, the same as genetic.crossover applied to each row
+def crossover(engine, rng, parents1, parents2):
+    count, tasks = parents1.shape
+    point1 = rng.integers(1, tasks, count)
+    point2 = rng.integers(1, tasks - 1, count)
+    point2 += point2 >= point1
+    point1, point2 = np.minimum(point1, point2), np.maximum(point1, point2)
+    children1 = crossover_children(parents1, parents2, point1, point2)
+    children2 = crossover_children(parents2, parents1, point1, point2)
+    return np.stack((children1, children2), axis=1).reshape(2 * count, tasks)
+
+
+# Swap mutation of the rows chosen with the mutation rate, the same as genetic.mutate applied to each row: the two
+# positions are drawn among the pairs that are not next to each other, taking two positions of a list one shorter
+# and moving the last one a step to the right
+def mutate(engine, rng, population):
+    count, tasks = population.shape
+    rows = np.flatnonzero(rng.random(count) < engine.mutation_rate)
+    point1 = rng.integers(0, tasks - 1, len(rows))
+    point2 = rng.integers(0, tasks - 2, len(rows))
+    point2 += point2 >= point1
+    point1, point2 = np.minimum(point1, point2), np.maximum(point1, point2) + 1
+    population[rows, point1], population[rows, point2] = population[rows, point2], population[rows, point1]
+    return population
+
+
+# Population of random key vectors, one row of priorities per individual
+def initialize_random_keys(engine, rng, population_size):
+    return rng.random((population_size, engine.tasks))
+
+
+# Uniform crossover of every pair of parents, the same as randomkey.crossover applied to each row
+def uniform_crossover(engine, rng, parents1, parents2):
+    count, tasks = parents1.shape
+    from_first = rng.random((count, tasks)) < engine.crossover_bias
+    children1 = np.where(from_first, parents1, parents2)
+    children2 = np.where(from_first, parents2, parents1)
+    return np.stack((children1, children2), axis=1).reshape(2 * count, tasks)
+
+
+# New priority for a random task of the rows chosen with the mutation rate
+def mutate_random_keys(engine, rng, population):
+    count, tasks = population.shape
+    rows = np.flatnonzero(rng.random(count) < engine.mutation_rate)
+    population[rows, rng.integers(0, tasks, len(rows))] = rng.random(len(rows))
+    return population
+
+
+# Predecessor and successor matrices (0-indexed) of the instance of the engine, row t marks the ones of task t
+def get_precedence_matrices(engine):
+    if 'precedence_matrices' not in engine.cache:
+        matrices = np.zeros((2, engine.tasks, engine.tasks), dtype=bool)
+        for index, relatives in enumerate(activitylist.get_precedence(engine)):
+            for task, others in enumerate(relatives):
+                matrices[index, task, others] = True
+        engine.cache['precedence_matrices'] = matrices
+    return engine.cache['precedence_matrices']
+
+
+# Population of random activity lists, one per row: at every position each row takes a random task among the ones
+# whose predecessors are all listed, as activitylist.random_activity_list does for one list
+def initialize_activity_lists(engine, rng, population_size):
+    predecessors, successors = get_precedence_matrices(engine)
+    rows = np.arange(population_size)
+    pending = np.tile(predecessors.sum(axis=1), (population_size, 1))
+    population = np.zeros((population_size, engine.tasks), dtype=np.int64)
+    for position in range(engine.tasks):
+        eligible = pending == 0
+        if not eligible.any(axis=1).all():
+            raise ValueError("The task dependencies contain a cycle")
+        task = np.argmax(np.where(eligible, rng.random(pending.shape), -1), axis=1)
+        population[:, position] = task + 1
+        pending[rows, task] = -1
+        pending -= successors[task]
+    return population
+
+
+def hartmann_children(mothers, fathers, point1, point2):
+    # Each child keeps the head [0, point1) of its mother, takes the next point2 - point1 tasks in the order of its
+    # father and the remaining tasks in the order of its mother
+    count, tasks = mothers.shape
+    rows = np.broadcast_to(np.arange(count)[:, None], mothers.shape)
+    head = np.arange(tasks) < point1[:, None]
+    listed = np.zeros((count, tasks + 1), dtype=bool)
+    np.put_along_axis(listed, mothers, head, axis=1)
+    free = ~np.take_along_axis(listed, fathers, axis=1)
+    rank = np.cumsum(free, axis=1) - 1
+    middle = free & (rank < (point2 - point1)[:, None])
+    listed[rows[middle], fathers[middle]] = True
+    tail = ~np.take_along_axis(listed, mothers, axis=1)
+    children = np.where(head, mothers, 0)
+    children[rows[middle], (point1[:, None] + rank)[middle]] = fathers[middle]
+    children[rows[tail], (point2[:, None] + np.cumsum(tail, axis=1) - 1)[tail]] = mothers[tail]
+    return children
+
+
+# Hartmann's crossover of every pair of parents with the number of cut points of the engine, the same as
+# activitylist.crossover applied to each row
+def activity_list_crossover(engine, rng, parents1, parents2):
+    count, tasks = parents1.shape
+    if engine.crossover_points == 1:
+        point1 = rng.integers(1, tasks, count)
+        point2 = np.full(count, tasks)
+    else:
+        point1 = rng.integers(1, tasks, count)
+        point2 = rng.integers(1, tasks - 1, count)
+        point2 += point2 >= point1
+        point1, point2 = np.minimum(point1, point2), np.maximum(point1, point2)
+    children1 = hartmann_children(parents1, parents2, point1, point2)
+    children2 = hartmann_children(parents2, parents1, point1, point2)
+    return np.stack((children1, children2), axis=1).reshape(2 * count, tasks)
+
+
+# Shift mutation of the rows chosen with the mutation rate, the same as activitylist.shift_mutation applied to each
+# row: a task moves to a random position between its last predecessor and its first successor
+def shift_mutation(engine, rng, population):
+    count, tasks = population.shape
+    predecessors, successors = get_precedence_matrices(engine)
+    rows = np.flatnonzero(rng.random(count) < engine.mutation_rate)
+    lists = population[rows]
+    index = rng.integers(0, tasks, len(rows))
+    task = lists[np.arange(len(rows)), index] - 1
+    # Position of every task in the list without the task moved
+    positions = np.argsort(lists, axis=1)
+    positions -= positions > index[:, None]
+    first = np.where(predecessors[task], positions, -1).max(axis=1, initial=-1) + 1
+    last = np.where(successors[task], positions, tasks - 1).min(axis=1, initial=tasks - 1)
+    target = rng.integers(first, last + 1)
+    # Column of the list taken by every column of the mutated list, the one at the target gets the task moved
+    columns = np.arange(tasks)
+    source = columns - (columns > target[:, None])
+    source += source >= index[:, None]
+    moved = np.take_along_axis(lists, np.minimum(source, tasks - 1), axis=1)
+    moved[np.arange(len(rows)), target] = task + 1
+    population[rows] = moved
+    return population
+
+
+# Operators working on the whole population of every encoding
+array_operators = {
+    'permutation': (initialize_population, crossover, mutate),
+    'activity_list': (initialize_activity_lists, activity_list_crossover, shift_mutation),
+    'random_key': (initialize_random_keys, uniform_crossover, mutate_random_keys),
+}
+
+
+def select_best_population(population, fitness, size):
+    best = np.argsort(fitness, kind='stable')[:size]
+    return population[best], fitness[best]
+
+
+# Select the best rows for the next generation, keeping one copy of each when the evaluator removes duplicates
+def select_next_population(engine, rng, population, fitness, size, evaluator, initialize):
+    if not isinstance(evaluator, diversity.DeduplicatingEvaluator):
+        return select_best_population(population, fitness, size)
+    selected, selected_fitness = diversity.select_unique_population(
+        engine, population.tolist(), fitness.tolist(), size, evaluator,
+        lambda count: initialize(engine, rng, count).tolist())
+    return np.array(selected, dtype=population.dtype), np.array(selected_fitness)
+
+
+def vectorized_genetic_algorithm(engine, evaluator=None, advanced=False, history=None):
+    """
+    Genetic algorithm with the population stored in a 2-D array (of tasks or of random keys), one schedule per row.
+    Selection, crossover and mutation work on the whole generation at once; only the makespans are computed schedule by schedule by the
+    evaluator. The random numbers come from a numpy generator seeded from the generator of the engine.
+    :param engine: GeneticEngine with the instance and the settings of the run
+    :param evaluator: evaluator of the makespans, SerialEvaluator by default
+    :param advanced: whether to keep the elite individuals and decrease the mutation rate as in the advanced algorithm
+    :param history: optional list or telemetry sink that receives the record of every generation
+    :return: tuple with the best schedule and its makespan
+    """
+    if engine.tasks < 3:
+        if advanced:
+            return genetic.advanced_genetic_algorithm(engine, evaluator, history=history)
+        return genetic.genetic_algorithm(engine, evaluator, history=history)
+    if engine.selection_method not in selection_methods:
+        raise ValueError(f"Unknown selection method {engine.selection_method!r}, expected one of {tuple(selection_methods)}")
+    initialize, recombine, perturb = array_operators[engine.encoding]
+    select = selection_methods[engine.selection_method]
+    evaluator = evaluator or evaluation.SerialEvaluator(engine)
+    monitor = telemetry.Monitor(engine, history, evaluator)
+    rng = np.random.default_rng(engine.rng.getrandbits(64))
+    population_size = engine.population_size
+    elite_size = int(0.1 * population_size) if advanced else 0
+
+    population = initialize(engine, rng, population_size)
+    if engine.warm_start is not None:
+        population[0] = genetic.encode_start_times(engine, engine.warm_start)
+    fitness = np.array(evaluator.evaluate(population.tolist()))
+    best_schedule = population[0].copy()
+    best_makespan = fitness[0]
+    no_improvement_count = 0
+
+    for generation in range(engine.generations):
+        # Stop as soon as the best schedule is proven optimal by the lower bound
+        if engine.is_optimal(best_schedule.tolist(), best_makespan):
+            break
+        pairs = population_size - elite_size
+        parents = select(engine, rng, fitness, 2 * pairs)
+        parents1 = population[parents[:pairs]]
+        parents2 = population[parents[pairs:]]
+        children = perturb(engine, rng, recombine(engine, rng, parents1, parents2))
+        children_fitness = np.array(evaluator.evaluate(children.tolist()))
+
+        if advanced:
+            # Keep the elite individuals from the previous population
+            elite, elite_fitness = select_best_population(population, fitness, elite_size)
+            new_population = np.concatenate((children, elite))
+            new_fitness = np.concatenate((children_fitness, elite_fitness))
+            engine.mutation_rate = max(0.05, engine.mutation_rate * 0.95)
+        else:
+            # Keep the best solution found
+            new_population = np.concatenate((children, best_schedule[None, :]))
+            new_fitness = np.append(children_fitness, best_makespan)
+        population, fitness = select_next_population(engine, rng, new_population, new_fitness, population_size,
+                                                     evaluator, initialize)
+        if history is not None:
+            monitor.record(generation, population.tolist(), fitness.tolist())
+
+        # Check for improvement in best makespan
+        if fitness[0] < best_makespan:
+            best_schedule = population[0].copy()
+            best_makespan = fitness[0]
+            no_improvement_count = 0
+        else:
+            no_improvement_count += 1
+
+        # Termination condition: Stop if no improvement for a certain number of generations
+        if no_improvement_count >= engine.max_no_improvement:
+            break
+
+    return best_schedule.tolist(), int(best_makespan)
@@ -0,0 +1,15 @@
+def get_demand_matrix(resources, task_resource):
+    """
+    Returns the amount of every resource type required by each task together with the capacity of every type
+    :param resources: capacity of the single resource, or list with the capacity of every resource type
+    :param task_resource: list of resources required by each task, one amount or a list with the amount of every type
+    :return: tuple with the demand matrix (a row per task) and the list of capacities
+    """
+    if isinstance(resources, int):
+        return [[demand] for demand in task_resource], [resources]
+    capacities = list(resources)
+    demands = [list(demand) for demand in task_resource]
+    for task, demand in enumerate(demands):
+        if len(demand) != len(capacities):
+            raise ValueError(f"Task {task + 1} requires {len(demand)} resource types but there are {len(capacities)}")
+    return demands, capacities
@@ -0,0 +1,19 @@
+import random
+
+
+def random_instance(tasks, seed=None, resources=10, max_duration=8, density=0.1):
+    """
+    Generates a random instance with a single resource
+    :param tasks: number of tasks
+    :param seed: seed of the random number generator
+    :param resources: capacity of the resource, every task requires between 1 and all of it
+    :param max_duration: longest duration of a task, every task lasts at least 1
+    :param density: probability of a dependency between every task and each later one
+    :return: tuple with the tasks, resources, task durations, task resources and (1-indexed) task dependencies
+    """
+    rng = random.Random(seed)
+    task_duration = [rng.randint(1, max_duration) for _ in range(tasks)]
+    task_resource = [rng.randint(1, resources) for _ in range(tasks)]
+    task_dependencies = [(pre + 1, suc + 1) for pre in range(tasks) for suc in range(pre + 1, tasks)
+                         if rng.random() < density]
+    return tasks, resources, task_duration, task_resource, task_dependencies
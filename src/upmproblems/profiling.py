@@ -0,0 +1,214 @@
+import cProfile
+import functools
+import importlib
+import pstats
+import tracemalloc
+
+# Functions of every phase of the solvers, as (module, qualified name). The modules that start with a dot belong to
+# this project. A function outside every phase is counted in the phase of the function that called it.
+phases = {
+    'lower_bound': [('.upmsearch.bounds', 'lower_bounds')],
+    'bound': [('.upmsearch.branchandbound', 'calculate_bound'), ('.upmsearch.astar', 'heuristic'),
+              ('.upmsearch.search_exercises', 'ProblemState.child_bound')],
+    'children': [('.upmsearch.branchandbound', 'place_task'),
+                 ('.upmsearch.branchandbound', 'is_precedence_satisfied'),
+                 ('.upmsearch.branchandbound', 'update_resource_usage'),
+                 ('.upmsearch.search_exercises', 'ProblemState.possible_moves'),
+                 ('.upmsearch.search_exercises', 'ProblemState.is_symmetric'),
+                 ('.upmsearch.search_exercises', 'ProblemState.apply_move')],
+    'propagation': [('.upmsearch.propagation', 'TimetablePropagator.initial_windows'),
+                    ('.upmsearch.propagation', 'TimetablePropagator.fix')],
+    'heap': [('heapq', 'heappush'), ('heapq', 'heappop')],
+    'initialization': [('.upmevo.genetic', 'initialize_population'), ('.upmevo.activitylist', 'initialize_population'),
+                       ('.upmevo.randomkey', 'initialize_population')],
+    'selection': [('.upmevo.selection', 'select_parents'), ('.upmevo.genetic', 'tournament_selection'),
+                  ('.upmevo.genetic', 'select_best_population'), ('.upmevo.genetic', 'select_next_population')],
+    'crossover': [('.upmevo.genetic', 'crossover'), ('.upmevo.activitylist', 'crossover'),
+                  ('.upmevo.randomkey', 'crossover')],
+    'mutation': [('.upmevo.genetic', 'mutate'), ('.upmevo.activitylist', 'shift_mutation'),
+                 ('.upmevo.randomkey', 'mutate')],
+    'decode': [('.upmproblems.schedule', 'serial_schedule'), ('.upmevo.genetic', 'calculate_makespan'),
+               ('.upmevo.randomkey', 'get_task_orders'), ('.upmevo.localsearch', 'ListDecoder.decode'),
+               ('.upmevo.localsearch', 'ListDecoder.evaluate')],
+    'local_search': [('.upmevo.localsearch', 'improve'), ('.upmevo.localsearch', 'improve_elite')],
+}
+# Frames kept by tracemalloc in the traceback of every block, the innermost phase function among them gets its memory
+traceback_frames = 8
+
+
+def get_phase_functions():
+    # Code object (or built-in function) of every function of the phases
+    package = __package__.rpartition('.')[0]
+    phase_functions = {}
+    for phase, functions in phases.items():
+        for module_name, qualified_name in functions:
+            function = importlib.import_module(module_name, package)
+            for name in qualified_name.split('.'):
+                function = getattr(function, name)
+            phase_functions[getattr(function, '__code__', function)] = phase
+    return phase_functions
+
+
+def get_function_key(function):
+    # Key of a function (a code object or a built-in function) in the statistics of cProfile
+    if hasattr(function, 'co_filename'):
+        return function.co_filename, function.co_firstlineno, function.co_name
+    return '~', 0, f'<built-in method {function.__module__}.{function.__name__}>'
+
+
+def get_phase_shares(statistics, phase_keys):
+    """
+    Share of the time of every function that belongs to every phase. A function of a phase belongs to it, any other
+    one to the phases of its callers, weighted by the cumulative time of every caller. The time of a phase thus
+    leaves out the one of the phases nested in it.
+    :param statistics: statistics of cProfile, from the key of every function to (primitive calls, calls, own time,
+                       cumulative time, callers)
+    :param phase_keys: dictionary from the key of a function of a phase to its phase
+    :return: dictionary from the key of every function to a dictionary with the share of every phase
+    """
+    shares = {}
+
+    def get_shares(key, visiting):
+        if key in shares:
+            return shares[key]
+        if key in phase_keys:
+            return {phase_keys[key]: 1.0}
+        callers = {caller: edge for caller, edge in statistics[key][4].items()
+                   if caller in statistics and caller not in visiting}
+        total = sum(edge[3] for edge in callers.values())
+        result = {}
+        for caller, edge in callers.items():
+            weight = edge[3] / total if total > 0 else 1 / len(callers)
+            for phase, share in get_shares(caller, visiting | {key}).items():
+                result[phase] = result.get(phase, 0.0) + weight * share
+        shares[key] = result or {'other': 1.0}
+        return shares[key]
+
+    return {key: get_shares(key, frozenset()) for key in statistics}
+
+
+def get_phase_lines(phase_functions):
+    # Lines of the source of every phase function written in Python, as file -> [(first line, last line, phase)]
+    phase_lines = {}
+    for function, phase in phase_functions.items():
+        if hasattr(function, 'co_lines'):
+            last = max((line for _, _, line in function.co_lines() if line is not None), default=function.co_firstlineno)
+            phase_lines.setdefault(function.co_filename, []).append((function.co_firstlineno, last, phase))
+    return phase_lines
+
+
+def get_phase_memory(snapshot, phase_lines):
+    # Bytes of the blocks traced in a snapshot of tracemalloc, charged to the innermost phase function in the
+    # traceback of their allocation
+    memory = {}
+    for trace in snapshot.traces:
+        phase = 'other'
+        for frame in reversed(trace.traceback):  # From the most recent frame
+            ranges = phase_lines.get(frame.filename, ())
+            found = next((phase for first, last, phase in ranges if first <= frame.lineno <= last), None)
+            if found is not None:
+                phase = found
+                break
+        memory[phase] = memory.get(phase, 0) + trace.size
+    return memory
+
+
+def get_collapsed_stacks(statistics, min_seconds=1e-6):
+    """
+    Stacks of calls rebuilt from the callers of every function, as flameprof does with a pstats file: the time of
+    a function in a stack is split among its callees in proportion to their cumulative time under it. The stacks
+    are estimates, a function called from several places spends the same share of its time in each.
+    :return: dictionary from the collapsed stack (functions separated by semicolons) to the seconds spent in its last
+             function
+    """
+    callees = {}
+    for key, (_, _, _, _, callers) in statistics.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((key, edge[3]))
+    stacks = {}
+
+    def expand(key, path, seconds, visiting):
+        cumulative = statistics[key][3] or seconds or 1.0
+        stacks[path] = stacks.get(path, 0.0) + seconds * min(1.0, statistics[key][2] / cumulative)
+        for callee, edge_seconds in callees.get(key, ()):
+            callee_seconds = seconds * edge_seconds / cumulative
+            if callee not in visiting and callee_seconds >= min_seconds:
+                expand(callee, f'{path};{pstats.func_std_string(callee)}', callee_seconds, visiting | {callee})
+
+    for key, (_, _, _, cumulative, callers) in statistics.items():
+        if not callers:
+            expand(key, pstats.func_std_string(key), cumulative, frozenset([key]))
+    return stacks
+
+
+def write_collapsed(stacks, path):
+    # One line per stack with its frames separated by semicolons and its time in microseconds, the input of
+    # flamegraph.pl and speedscope
+    with open(path, 'w') as file:
+        for stack, seconds in sorted(stacks.items()):
+            if stack and round(seconds * 1e6) > 0:
+                file.write(f'{stack} {round(seconds * 1e6)}\n')
+
+
+def format_phases(phase_totals, peak_memory):
+    total = sum(seconds for _, seconds, _ in phase_totals.values()) or 1.0
+    lines = [f"{'phase':<16} {'calls':>9} {'seconds':>9} {'share':>6} {'retained KB':>12}"]
+    for phase, (calls, seconds, retained) in sorted(phase_totals.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{phase:<16} {calls:>9} {seconds:>9.3f} {seconds / total:>6.1%} {retained / 1024:>12.0f}")
+    lines.append(f"peak traced memory: {peak_memory / 1024:.0f} KB")
+    return '\n'.join(lines)
+
+
+def profile_call(path, function, *args, **kwargs):
+    """
+    Profiles a single run of a call under cProfile and tracemalloc, so randomised and time limited solvers are
+    profiled in the run whose result is returned. The statistics of cProfile are written to path.pstats, the stacks
+    of calls rebuilt from them to path.collapsed for flame graphs, and the time and memory of every phase to
+    path.phases. The time of a phase comes from the callers of the functions in the statistics, without the time of
+    the phases nested in it; its memory is the one still allocated when the call returns, charged to the innermost
+    phase function in the traceback of every block.
+    :param path: prefix of the paths of the files written
+    :return: tuple with the result of the call and a dictionary with the calls, seconds and retained bytes of every
+             phase
+    """
+    phase_functions = get_phase_functions()
+    profiler = cProfile.Profile()
+    tracemalloc.start(traceback_frames)
+    try:
+        result = profiler.runcall(function, *args, **kwargs)
+        snapshot = tracemalloc.take_snapshot()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    profiler.dump_stats(path + '.pstats')
+    profiler.create_stats()
+    statistics = profiler.stats
+
+    phase_keys = {get_function_key(function): phase for function, phase in phase_functions.items()}
+    phase_totals = {}
+    for key, phase_shares in get_phase_shares(statistics, phase_keys).items():
+        for phase, share in phase_shares.items():
+            totals = phase_totals.setdefault(phase, [0, 0.0, 0])
+            totals[1] += share * statistics[key][2]
+    for key, phase in phase_keys.items():
+        if key in statistics:
+            phase_totals.setdefault(phase, [0, 0.0, 0])[0] += statistics[key][1]
+    for phase, retained in get_phase_memory(snapshot, get_phase_lines(phase_functions)).items():
+        phase_totals.setdefault(phase, [0, 0.0, 0])[2] += retained
+    phase_totals = {phase: tuple(totals) for phase, totals in phase_totals.items()}
+
+    write_collapsed(get_collapsed_stacks(statistics), path + '.collapsed')
+    with open(path + '.phases', 'w') as file:
+        file.write(format_phases(phase_totals, peak_memory) + '\n')
+    return result, phase_totals
+
+
+def profiled(function):
+    # Adds to a solver entry point the opt-in profile argument: the prefix of the files of profile_call, None to run
+    # it without profiling
+    @functools.wraps(function)
+    def entry_point(*args, profile=None, **kwargs):
+        if profile is None:
+            return function(*args, **kwargs)
+        return profile_call(profile, function, *args, **kwargs)[0]
+    return entry_point
@@ -0,0 +1,51 @@
+def read_sections(lines):
+    # Lines of every section of the file, the sections are separated by lines of asterisks
+    sections = []
+    section = []
+    for line in lines:
+        if line.startswith('*'):
+            if section:
+                sections.append(section)
+            section = []
+        elif line.strip():
+            section.append(line)
+    if section:
+        sections.append(section)
+    return sections
+
+
+def read_psplib(path):
+    """
+    Reads a single-mode instance of the PSPLIB (.sm file). The dummy start and end jobs are left out, so job j of
+    the file is task j - 1 of the instance.
+    :param path: path of the file
+    :return: tuple with the tasks, resources, task durations, task resources and (1-indexed) task dependencies. With
+             a single renewable resource the resources and the requirement of every task are numbers, with more
+             they are lists with a value for each resource type, as accepted by upmsearch.
+    """
+    with open(path) as file:
+        sections = read_sections(file.read().splitlines())
+    precedences = next(section for section in sections if section[0].startswith('PRECEDENCE RELATIONS'))
+    requests = next(section for section in sections if section[0].startswith('REQUESTS/DURATIONS'))
+    availabilities = next(section for section in sections if section[0].startswith('RESOURCEAVAILABILITIES'))
+
+    jobs = len(precedences) - 2  # Title and header lines
+    tasks = jobs - 2
+    task_dependencies = []
+    for line in precedences[2:]:
+        job, _, _, *successors = map(int, line.split())
+        task_dependencies.extend((job - 1, successor - 1) for successor in successors
+                                 if 1 < job and successor < jobs)
+
+    task_duration = [0] * tasks
+    task_resource = [None] * tasks
+    for line in requests[3:]:  # Title, header and dashes
+        job, _, duration, *demands = map(int, line.split())
+        if 1 < job < jobs:
+            task_duration[job - 2] = duration
+            task_resource[job - 2] = demands
+    capacities = list(map(int, availabilities[2].split()))
+
+    if len(capacities) == 1:
+        return tasks, capacities[0], task_duration, [demands[0] for demands in task_resource], task_dependencies
+    return tasks, capacities, task_duration, task_resource, task_dependencies
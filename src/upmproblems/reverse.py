@@ -0,0 +1,74 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from .schedule import get_makespan
+
+directions = ('forward', 'backward', 'both')
+
+
+def reverse_instance(tasks, resources, task_duration, task_resource, task_dependencies):
+    """
+    Returns the instance with every dependency reversed, so that it can be scheduled from the end of the project
+    :param tasks: number of tasks in the task planning problem with resources
+    :param resources: number of resources in the task planning problem with resources
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :return: tuple with the same parameters describing the reversed instance
+    """
+    return tasks, resources, list(task_duration), list(task_resource), [(suc, pre) for pre, suc in task_dependencies]
+
+
+def to_forward_start_times(start_times, task_duration):
+    """
+    Maps the start times of a schedule of the reversed instance back to start times of the original instance
+    :param start_times: list with the start time of each task in the reversed instance
+    :param task_duration: list of durations of the tasks
+    :return: list with the start time of each task in the original instance, with the same makespan
+    """
+    makespan = get_makespan(start_times, task_duration)
+    return [makespan - start - duration for start, duration in zip(start_times, task_duration)]
+
+
+def best_start_times(candidates, task_duration):
+    # Empty lists mean that no solution was found, ties are kept in favour of the first candidate
+    candidates = [start_times for start_times in candidates if start_times]
+    return min(candidates, key=lambda start_times: get_makespan(start_times, task_duration), default=[])
+
+
+def solve_in_direction(solver, direction, tasks, resources, task_duration, task_resource, task_dependencies,
+                       warm_start=None):
+    """
+    Runs a solver on the original instance, on the reversed instance or on both of them at the same time
+    :param solver: function receiving the instance parameters and returning the start time of each task
+    :param direction: 'forward', 'backward' or 'both'; with 'both' each direction runs in its own process
+    :param tasks: number of tasks in the task planning problem with resources
+    :param resources: number of resources in the task planning problem with resources
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param warm_start: optional start times of a known schedule, passed to the solver as its warm_start argument
+                       (mirrored for the reversed instance)
+    :return: list with the start time of each task in the best solution found, or empty list if no solution was found
+    """
+    if direction not in directions:
+        raise ValueError(f"Unknown direction {direction!r}, expected one of {directions}")
+    if tasks == 0:
+        return []
+
+    instance = (tasks, resources, task_duration, task_resource, task_dependencies)
+    forward_options = {}
+    backward_options = {}
+    if warm_start is not None:
+        # Mirroring a schedule in time maps it to a schedule of the reversed instance, and back
+        forward_options['warm_start'] = warm_start
+        backward_options['warm_start'] = to_forward_start_times(warm_start, task_duration)
+    if direction == 'forward':
+        return solver(*instance, **forward_options)
+    if direction == 'backward':
+        return to_forward_start_times(solver(*reverse_instance(*instance), **backward_options), task_duration)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        forward = executor.submit(solver, *instance, **forward_options)
+        backward = executor.submit(solver, *reverse_instance(*instance), **backward_options)
+        candidates = [forward.result(), to_forward_start_times(backward.result(), task_duration)]
+    return best_start_times(candidates, task_duration)
@@ -0,0 +1,97 @@
+import heapq
+
+
+# Build the list of predecessors (0-indexed) of every task from the 1-indexed dependency tuples
+def get_predecessors(tasks, task_dependencies):
+    predecessors = [[] for _ in range(tasks)]
+    for pre, suc in task_dependencies:
+        predecessors[suc - 1].append(pre - 1)
+    return predecessors
+
+
+# Build the list of successors (0-indexed) of every task from the 1-indexed dependency tuples
+def get_successors(tasks, task_dependencies):
+    successors = [[] for _ in range(tasks)]
+    for pre, suc in task_dependencies:
+        successors[pre - 1].append(suc - 1)
+    return successors
+
+
+def get_makespan(start_times, task_duration):
+    return max((start + duration for start, duration in zip(start_times, task_duration)), default=0)
+
+
+def serial_schedule(task_order, resources, task_duration, task_resource, task_dependencies):
+    """
+    Decodes a task order into start times with the serial schedule generation scheme
+    :param task_order: list with the (0-indexed) tasks ordered by priority, it does not need to respect the dependencies
+    :param resources: capacity of the renewable resource
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :return: list with the start time of each task
+    """
+    tasks = len(task_order)
+    predecessors = get_predecessors(tasks, task_dependencies)
+    successors = get_successors(tasks, task_dependencies)
+    position = [0] * tasks
+    for index, task in enumerate(task_order):
+        position[task] = index
+
+    # Tasks become eligible once all their predecessors are scheduled, the earliest one in the order goes first
+    pending = [len(predecessors[task]) for task in range(tasks)]
+    eligible = [(position[task], task) for task in range(tasks) if pending[task] == 0]
+    heapq.heapify(eligible)
+
+    start_times = [0] * tasks
+    usage = []
+    while eligible:
+        _, task = heapq.heappop(eligible)
+        duration = task_duration[task]
+        demand = task_resource[task]
+        if demand > resources:
+            raise ValueError(f"Task {task + 1} requires {demand} resources but only {resources} are available")
+
+        start = max((start_times[pre] + task_duration[pre] for pre in predecessors[task]), default=0)
+        time = start
+        while time < start + duration:
+            if time < len(usage) and usage[time] + demand > resources:
+                start = time + 1
+            time += 1
+
+        if len(usage) < start + duration:
+            usage.extend([0] * (start + duration - len(usage)))
+        for time in range(start, start + duration):
+            usage[time] += demand
+        start_times[task] = start
+
+        for suc in successors[task]:
+            pending[suc] -= 1
+            if pending[suc] == 0:
+                heapq.heappush(eligible, (position[suc], suc))
+
+    return start_times
+
+
+# Order the (0-indexed) tasks so that every task comes after all its predecessors
+def get_topological_order(tasks, task_dependencies):
+    successors = get_successors(tasks, task_dependencies)
+    pending = [0] * tasks
+    for pre, suc in task_dependencies:
+        pending[suc - 1] += 1
+    order = [task for task in range(tasks) if pending[task] == 0]
+    for task in order:
+        for suc in successors[task]:
+            pending[suc] -= 1
+            if pending[suc] == 0:
+                order.append(suc)
+    return order
+
+
+# Length of the longest chain of durations from the start of every task to the end of the project
+def get_tails(tasks, task_duration, task_dependencies):
+    successors = get_successors(tasks, task_dependencies)
+    tails = [0] * tasks
+    for task in reversed(get_topological_order(tasks, task_dependencies)):
+        tails[task] = task_duration[task] + max((tails[suc] for suc in successors[task]), default=0)
+    return tails
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+from .demand import get_demand_matrix
+from .schedule import get_makespan
+
+
+def fingerprint(tasks, resources, task_duration, task_resource, task_dependencies):
+    """
+    Hash of the durations, demands, capacities and dependencies of an instance. A single resource and a list with
+    one resource type give the same hash, and so do the same dependencies listed in another order or repeated.
+    :return: hexadecimal SHA-256 digest
+    """
+    demands, capacities = get_demand_matrix(resources, task_resource)
+    canonical = dict(durations=[int(duration) for duration in task_duration],
+                     demands=[[int(amount) for amount in demand] for demand in demands],
+                     capacities=[int(capacity) for capacity in capacities],
+                     dependencies=sorted({(int(pre), int(suc)) for pre, suc in task_dependencies}))
+    return hashlib.sha256(json.dumps(canonical, separators=(',', ':')).encode()).hexdigest()
+
+
+class SolutionCache:
+    """
+    Best schedule known of every instance, stored in a SQLite database together with whether it is proven optimal,
+    the solver that found it and its metadata. Several processes can share the same database.
+    :param path: path of the database file, ':memory:' for a cache that only lasts as long as the object
+    """
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions (fingerprint TEXT PRIMARY KEY, start_times TEXT NOT NULL, "
+                "makespan INTEGER NOT NULL, optimal INTEGER NOT NULL, solver TEXT, metadata TEXT, updated REAL)")
+
+    def lookup(self, tasks, resources, task_duration, task_resource, task_dependencies):
+        """
+        :return: dictionary with the start times, the makespan, whether it is proven optimal, the solver and the
+                 metadata of the schedule stored for the instance, or None if there is none
+        """
+        row = self.connection.execute(
+            "SELECT start_times, makespan, optimal, solver, metadata FROM solutions WHERE fingerprint = ?",
+            (fingerprint(tasks, resources, task_duration, task_resource, task_dependencies),)).fetchone()
+        if row is None:
+            return None
+        start_times, makespan, optimal, solver, metadata = row
+        return dict(start_times=json.loads(start_times), makespan=makespan, optimal=bool(optimal), solver=solver,
+                    metadata=json.loads(metadata))
+
+    def store(self, tasks, resources, task_duration, task_resource, task_dependencies, start_times, optimal=False,
+              solver=None, metadata=None):
+        """
+        Stores a schedule of an instance unless the cache already holds a shorter one, or one as short that is
+        proven optimal
+        :param start_times: list with the start time of each task
+        :param optimal: whether the schedule is proven optimal
+        :param solver: name of the solver that found the schedule
+        :param metadata: optional dictionary, serializable to JSON, with the settings of the solver
+        :return: whether the schedule was stored
+        """
+        makespan = get_makespan(start_times, task_duration)
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (fingerprint) DO UPDATE SET "
+                "start_times = excluded.start_times, makespan = excluded.makespan, optimal = excluded.optimal, "
+                "solver = excluded.solver, metadata = excluded.metadata, updated = excluded.updated "
+                "WHERE excluded.makespan < makespan OR excluded.makespan = makespan AND excluded.optimal > optimal",
+                (fingerprint(tasks, resources, task_duration, task_resource, task_dependencies),
+                 json.dumps([int(start) for start in start_times]), makespan, int(optimal), solver,
+                 json.dumps(metadata or {}), time.time()))
+        return cursor.rowcount > 0
+
+    def close(self):
+        self.connection.close()
+
+
+def solve_cached(cache, solver_name, solver, tasks, resources, task_duration, task_resource, task_dependencies,
+                 exact=False, lower_bound=None, metadata=None):
+    """
+    Returns the schedule of the cache if it is proven optimal, without running the solver. Otherwise runs the solver
+    with the schedule of the cache, if any, as warm start and stores the schedule found. The ones of a heuristic
+    solver are proven optimal when they reach the lower bound of the instance.
+    :param cache: SolutionCache, or path of its database
+    :param solver_name: name of the solver stored with the schedule
+    :param solver: function receiving the warm start (start times, or None) and returning the start time of each
+                   task, or empty list if no solution was found
+    :param exact: whether the schedules found by the solver are optimal
+    :param lower_bound: optional function that returns a lower bound of the makespan of a single resource instance,
+                        taking its parameters, e.g. upmsearch.bounds.lower_bound
+    :param metadata: optional dictionary, serializable to JSON, with the settings of the solver
+    :return: list with the start time of each task in the best schedule known, or empty list if none is known
+    """
+    instance = (tasks, resources, task_duration, task_resource, task_dependencies)
+    own_cache = not isinstance(cache, SolutionCache)
+    if own_cache:
+        cache = SolutionCache(cache)
+    try:
+        entry = cache.lookup(*instance)
+        if entry is not None and entry['optimal']:
+            return entry['start_times']
+        warm_start = entry['start_times'] if entry is not None else None
+        start_times = solver(warm_start)
+        if not start_times:
+            return warm_start or []
+        makespan = get_makespan(start_times, task_duration)
+        if warm_start is not None and get_makespan(warm_start, task_duration) < makespan:
+            return warm_start
+        # The lower bound needs a single resource
+        optimal = exact or (lower_bound is not None and isinstance(resources, int)
+                            and makespan <= lower_bound(*instance))
+        cache.store(*instance, start_times, optimal, solver_name, metadata)
+        return start_times
+    finally:
+        if own_cache:
+            cache.close()
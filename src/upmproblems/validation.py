@@ -0,0 +1,82 @@
+import numpy as np
+
+from .demand import get_demand_matrix
+
+# Schedules checked at once, the usage of the resources of a chunk holds schedules * horizon * resource types values
+chunk_size = 1024
+
+
+def get_usage(start_times, ends, demand_matrix, origin, horizon):
+    # Usage of every resource type at every time of every schedule, from the sums of the demands starting and ending
+    # at every time
+    rows = len(start_times)
+    offsets = np.arange(rows)[:, None] * (horizon + 1) - origin
+    usage = np.empty((rows, horizon, demand_matrix.shape[1]), dtype=np.int64)
+    for resource, demands in enumerate(demand_matrix.T):
+        weights = np.broadcast_to(demands, start_times.shape).ravel()
+        delta = (np.bincount((start_times + offsets).ravel(), weights, minlength=rows * (horizon + 1))
+                 - np.bincount((ends + offsets).ravel(), weights, minlength=rows * (horizon + 1)))
+        usage[:, :, resource] = np.cumsum(delta.reshape(rows, horizon + 1), axis=1)[:, :horizon]
+    return usage
+
+
+def validate_schedules(tasks, resources, task_duration, task_resource, task_dependencies, schedules):
+    """
+    Checks many schedules of an instance at once: every task starts at a non-negative time and after the end of
+    its predecessors, and the tasks running at any time never require more than the capacity of a resource type
+    :param tasks: number of tasks in the task planning problem with resources
+    :param resources: capacity of the single resource, or list with the capacity of every resource type
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param schedules: list of schedules, lists with the start time of each task
+    :return: list with the violations of every schedule, empty for a feasible one. A violation is a tuple
+             ('start', task, start), ('precedence', predecessor, successor, end of the predecessor, start of the
+             successor) or ('capacity', time, resource type, usage, capacity); tasks and types count from 1
+    """
+    for index, schedule in enumerate(schedules):
+        if len(schedule) != tasks:
+            raise ValueError(f"Schedule {index} has {len(schedule)} start times but there are {tasks} tasks")
+    demands, capacities = get_demand_matrix(resources, task_resource)
+    durations = np.asarray(task_duration, dtype=np.int64)
+    demand_matrix = np.asarray(demands, dtype=np.int64).reshape(tasks, len(capacities))
+    capacity = np.asarray(capacities, dtype=np.int64)
+    predecessors, successors = (np.asarray(task_dependencies, dtype=np.int64).reshape(-1, 2) - 1).T
+    all_start_times = np.asarray(schedules, dtype=np.int64).reshape(len(schedules), tasks)
+
+    violations = [[] for _ in schedules]
+    for first in range(0, len(schedules), chunk_size):
+        start_times = all_start_times[first:first + chunk_size]
+        ends = start_times + durations
+        for row, task in zip(*np.nonzero(start_times < 0)):
+            violations[first + row].append(('start', int(task) + 1, int(start_times[row, task])))
+
+        late = ends[:, predecessors] > start_times[:, successors]
+        for row, dependency in zip(*np.nonzero(late)):
+            pre, suc = predecessors[dependency], successors[dependency]
+            violations[first + row].append(('precedence', int(pre) + 1, int(suc) + 1, int(ends[row, pre]),
+                                            int(start_times[row, suc])))
+
+        if tasks == 0:
+            continue
+        # Negative start times shift every time of the chunk, so that the usage is also checked before 0
+        origin = min(0, int(start_times.min()))
+        usage = get_usage(start_times, ends, demand_matrix, origin, int(ends.max()) - origin)
+        for row, time, resource in zip(*np.nonzero(usage > capacity)):
+            violations[first + row].append(('capacity', int(time) + origin, int(resource) + 1,
+                                            int(usage[row, time, resource]), int(capacity[resource])))
+    return violations
+
+
+def validate_schedule(tasks, resources, task_duration, task_resource, task_dependencies, start_times):
+    return validate_schedules(tasks, resources, task_duration, task_resource, task_dependencies, [start_times])[0]
+
+
+def format_violation(violation):
+    if violation[0] == 'start':
+        return f"Task {violation[1]} starts at {violation[2]}, before time 0"
+    if violation[0] == 'precedence':
+        return (f"Task {violation[2]} starts at {violation[4]}, before its predecessor {violation[1]} ends at "
+                f"{violation[3]}")
+    return (f"At time {violation[1]} the tasks running require {violation[3]} of resource {violation[2]}, whose "
+            f"capacity is {violation[4]}")
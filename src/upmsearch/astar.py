@@ -0,0 +1,105 @@
+import heapq
+
+from ..upmproblems.profiling import profiled
+from .branchandbound import (build_problem, build_propagator, calculate_bound, get_horizon, get_predecessors,
+                             is_cancelled, is_precedence_satisfied, place_task, share_incumbent, update_resource_usage)
+
+class Node:
+    def __init__(self, task_order, resource_usage, cost, estimate, start_times=None, resource_profile=None, windows=None):
+        self.task_order = task_order
+        self.resource_usage = resource_usage
+        self.cost = cost  # Actual cost to reach the current node
+        self.estimate = estimate  # Estimated cost to reach the goal from the current node
+        self.total_cost = cost + estimate  # Total estimated cost
+        self.start_times = start_times  # Start time of each scheduled task, None for the rest
+        self.resource_profile = resource_profile  # Usage of each resource at every time unit (a number if there is one)
+        self.windows = windows  # Start time windows kept by the TimetablePropagator
+
+    def __lt__(self, other):
+        return self.total_cost < other.total_cost
+
+def heuristic(task_order, tasks, resource_constraints):
+    remaining_tasks = set(range(len(tasks))) - set(task_order)
+    remaining_resource_demands = [max(tasks[task][1]) for task in remaining_tasks]
+    return max(remaining_resource_demands, default=0)
+
+# The incumbent and the stop event work as in rcpsp_branch_and_bound: with an incumbent the search goes on after the
+# first schedule until no node can end before the incumbent
+def rcpsp_a_star(tasks, resource_constraints, precedence_constraints, stats=None,
+                 propagation=False, incumbent=None, stop=None):
+    num_tasks = len(tasks)
+    num_resources = len(resource_constraints)
+    predecessors = get_predecessors(num_tasks, precedence_constraints)
+    best_schedule = None
+    open_set = []
+    infeasible_nodes_pruned = 0
+    incumbent_nodes_pruned = 0
+    nodes_expanded = 0
+    cancelled = False
+
+    # Without an incumbent the windows only hold schedules that end by the trivial horizon
+    propagator = build_propagator(tasks, resource_constraints, precedence_constraints) if propagation else None
+    horizon = get_horizon(None, tasks, incumbent)
+    windows = propagator.initial_windows(horizon) if propagation else None
+    initial_estimate = heuristic([], tasks, resource_constraints)
+    initial_node = Node([], [0] * num_resources, 0, initial_estimate, [None] * num_tasks, [], windows)
+    if not propagation or windows is not None:
+        heapq.heappush(open_set, initial_node)
+
+    while open_set:
+        if is_cancelled(stop):
+            cancelled = True
+            break
+        current_node = heapq.heappop(open_set)
+
+        if incumbent is not None:
+            # The length of the resource profile is the end of the scheduled tasks
+            if len(current_node.resource_profile) >= incumbent.value:
+                incumbent_nodes_pruned += 1
+                continue
+            if len(current_node.task_order) == num_tasks:
+                best_schedule = current_node
+                share_incumbent(incumbent, len(current_node.resource_profile))
+                continue
+        elif len(current_node.task_order) == num_tasks:
+            best_schedule = current_node
+            break  # Found a solution
+
+        nodes_expanded += 1
+        for task in range(num_tasks):
+            if task not in current_node.task_order and is_precedence_satisfied(current_node.task_order + [task], precedence_constraints):
+                new_start_times, new_resource_profile = place_task(task, current_node.start_times, current_node.resource_profile,
+                                                                   tasks, resource_constraints, predecessors)
+                if incumbent is not None and len(new_resource_profile) >= incumbent.value:
+                    incumbent_nodes_pruned += 1
+                    continue
+                new_windows = None
+                if propagation:
+                    if incumbent is not None:
+                        horizon = get_horizon(None, tasks, incumbent)
+                    new_windows = propagator.fix(current_node.windows, task, new_start_times[task], horizon)
+                    if new_windows is None:
+                        infeasible_nodes_pruned += 1
+                        continue
+                new_task_order = current_node.task_order + [task]
+                new_resource_usage = update_resource_usage(list(current_node.resource_usage), task, tasks)
+                new_cost = calculate_bound(Node(new_task_order, new_resource_usage, 0, 0), tasks, resource_constraints)
+                new_estimate = heuristic(new_task_order, tasks, resource_constraints)
+                new_node = Node(new_task_order, new_resource_usage, new_cost, new_estimate, new_start_times, new_resource_profile,
+                                new_windows)
+                heapq.heappush(open_set, new_node)
+
+    if stats is not None:
+        stats['infeasible_nodes_pruned'] = infeasible_nodes_pruned
+        stats['incumbent_nodes_pruned'] = incumbent_nodes_pruned
+        stats['nodes_expanded'] = nodes_expanded
+        stats['cancelled'] = cancelled
+    return best_schedule
+
+@profiled
+def rcpsp_a_star_schedule(tasks, resources, task_duration, task_resource, task_dependencies):
+    tasks_list, resource_constraints, precedence_constraints = build_problem(resources, task_duration, task_resource, task_dependencies)
+    best_schedule = rcpsp_a_star(tasks_list, resource_constraints, precedence_constraints)
+    if best_schedule is None:
+        return []
+    return best_schedule.start_times
@@ -0,0 +1,170 @@
+from ..upmproblems.schedule import get_tails
+from .propagation import TimetablePropagator
+
+# Largest k of the dual feasible functions of Fekete and Schepers used by the bin packing bound
+max_dual_k = 4
+# Probes spent at most on the destructive bound of an instance
+probe_limit = 20000
+
+
+class Probes:
+    """
+    Work of the destructive bound, counted in probes: a window revised by the propagation or an interval checked by
+    the energetic reasoning. Unlike a time limit, it gives the same bound on every machine and in every run.
+    :param limit: number of probes, None for no limit
+    :param propagator: TimetablePropagator of the bound, whose revisions are counted
+    """
+    def __init__(self, limit, propagator):
+        self.limit = limit
+        self.propagator = propagator
+        self.intervals = 0
+
+    def spend(self):
+        self.intervals += 1
+
+    @property
+    def spent(self):
+        return self.propagator.revisions + self.intervals
+
+    def exhausted(self):
+        return self.limit is not None and self.spent >= self.limit
+
+
+def critical_path_bound(tasks, task_duration, task_dependencies):
+    # No schedule is shorter than the longest chain of dependent tasks
+    return max(get_tails(tasks, task_duration, task_dependencies), default=0)
+
+
+def energy_bound(resources, task_duration, task_resource):
+    # No schedule ends before the total work fits in the capacity of the resource
+    total_energy = sum(duration * demand for duration, demand in zip(task_duration, task_resource))
+    return -(-total_energy // resources) if resources else 0
+
+
+def dual_weights(resources, task_resource, k):
+    """
+    Integer weights of the tasks and capacity for the dual feasible function u_k of Fekete and Schepers: a demand
+    that is a multiple of 1 / (k + 1) of the capacity keeps its share, any other one is rounded down to a multiple
+    of 1 / k. The tasks running at any time never weigh more than the capacity.
+    :return: tuple with the list of weights and the capacity, both scaled by k * resources
+    """
+    weights = [demand * k if (k + 1) * demand % resources == 0 else (k + 1) * demand // resources * resources
+               for demand in task_resource]
+    return weights, k * resources
+
+
+def bin_packing_bound(resources, task_duration, task_resource):
+    # Energy bound with the demands transformed by dual feasible functions, so that the tasks that cannot run
+    # together (k = 1: more than half of the capacity each) count as if they took the whole resource
+    bound = 0
+    for k in range(1, max_dual_k + 1):
+        weights, capacity = dual_weights(resources, task_resource, k)
+        total = sum(duration * weight for duration, weight in zip(task_duration, weights))
+        bound = max(bound, -(-total // capacity))
+    return bound
+
+
+def energetic_overload(windows, task_duration, weight_sets, probes):
+    # Energetic reasoning: in every interval, the part of each task that runs inside it wherever the task starts in
+    # its window cannot weigh more than the capacity over the length of the interval. Once the probes are spent the
+    # intervals left are not checked.
+    earliest = windows.earliest
+    latest = windows.latest
+    tasks = range(len(task_duration))
+    earliest_end = [earliest[task] + task_duration[task] for task in tasks]
+    latest_end = [latest[task] + task_duration[task] for task in tasks]
+    begins = sorted(set(earliest) | set(latest) | set(earliest_end))
+    ends = sorted(set(latest_end) | set(earliest_end) | set(latest))
+    for begin in begins:
+        for end in ends:
+            if end <= begin:
+                continue
+            if probes.exhausted():
+                return False
+            probes.spend()
+            length = end - begin
+            parts = [(task, min(task_duration[task], length, earliest_end[task] - begin, end - latest[task]))
+                     for task in tasks]
+            parts = [(task, part) for task, part in parts if part > 0]
+            for weights, capacity in weight_sets:
+                if sum(weights[task] * part for task, part in parts) > capacity * length:
+                    return True
+    return False
+
+
+def shave(propagator, windows, horizon, probes):
+    # A task that cannot start at the beginning of its window without emptying the windows of some task starts
+    # later; repeated until no window changes. Returns the windows, or None if some window becomes empty.
+    changed = True
+    while changed:
+        changed = False
+        for task in range(len(windows.earliest)):
+            if probes.exhausted():
+                return windows
+            while propagator.fix(windows, task, windows.earliest[task], horizon) is None:
+                if windows.earliest[task] == windows.latest[task]:
+                    return None
+                if probes.exhausted():
+                    return windows
+                old_earliest = list(windows.earliest)
+                old_latest = list(windows.latest)
+                windows = windows.copy()
+                windows.earliest[task] += 1
+                windows = propagator.propagate(windows, [task], old_earliest, old_latest)
+                if windows is None:
+                    return None
+                changed = True
+    return windows
+
+
+def no_schedule_within(propagator, horizon, task_duration, weight_sets, probes):
+    # Whether the propagation proves that no schedule ends by the horizon
+    windows = propagator.initial_windows(horizon)
+    if windows is None:
+        return True
+    windows = shave(propagator, windows, horizon, probes)
+    return windows is None or energetic_overload(windows, task_duration, weight_sets, probes)
+
+
+def lower_bounds(tasks, resources, task_duration, task_resource, task_dependencies, max_probes=probe_limit):
+    """
+    Lower bounds of the makespan of every schedule of the instance. The destructive bound starts from the largest of
+    the others and rejects one makespan after another while the timetable propagation, the shaving of the start
+    windows or the energetic reasoning prove that no schedule ends by it; once the probes are spent it keeps the
+    last makespan not rejected, which is still a lower bound. The bound only depends on the instance and the probes.
+    :param tasks: number of tasks in the task planning problem with resources
+    :param resources: number of resources in the task planning problem with resources
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param max_probes: maximum number of probes spent on the destructive bound, see Probes; None for no limit
+    :return: dictionary with the 'critical_path', 'energy', 'bin_packing' and 'destructive' bounds
+    """
+    bounds = {
+        'critical_path': critical_path_bound(tasks, task_duration, task_dependencies),
+        'energy': energy_bound(resources, task_duration, task_resource),
+        'bin_packing': bin_packing_bound(resources, task_duration, task_resource) if resources else 0,
+    }
+    bound = max(bounds.values())
+    if tasks and resources and max(task_resource) <= resources:
+        propagator = TimetablePropagator(task_duration, [[demand] for demand in task_resource], [resources],
+                                         [(pre - 1, suc - 1) for pre, suc in task_dependencies])
+        probes = Probes(max_probes, propagator)
+        weight_sets = [(task_resource, resources)] + [dual_weights(resources, task_resource, k) for k in (1, 2)]
+        while not probes.exhausted() and no_schedule_within(propagator, bound, task_duration, weight_sets, probes):
+            bound += 1
+    bounds['destructive'] = bound
+    return bounds
+
+
+def lower_bound(tasks, resources, task_duration, task_resource, task_dependencies, max_probes=probe_limit):
+    return max(lower_bounds(tasks, resources, task_duration, task_resource, task_dependencies, max_probes).values())
+
+
+def optimality_gap(makespan, bound):
+    # Share of the makespan above the lower bound, 0 when the schedule is proven optimal
+    return (makespan - bound) / bound if bound else 0.0
+
+
+def optimality_report(makespan, bound):
+    return dict(makespan=makespan, lower_bound=bound, optimal=makespan <= bound, gap=optimality_gap(makespan, bound))
@@ -0,0 +1,240 @@
+import heapq
+
+from ..upmproblems.demand import get_demand_matrix
+from ..upmproblems.profiling import profiled
+from .propagation import TimetablePropagator
+
+class Node:
+    def __init__(self, task_order, resource_usage, bound, start_times=None, resource_profile=None, windows=None):
+        self.task_order = task_order
+        self.resource_usage = resource_usage
+        self.bound = bound
+        self.start_times = start_times  # Start time of each scheduled task, None for the rest
+        self.resource_profile = resource_profile  # Usage of each resource at every time unit (a number if there is one)
+        self.windows = windows  # Start time windows kept by the TimetablePropagator
+
+    def __lt__(self, other):
+        return self.bound < other.bound
+
+def calculate_bound(node, tasks, resource_constraints):
+    if len(resource_constraints) == 1:
+        return calculate_bound_single_resource(node, tasks, resource_constraints[0])
+    remaining_resources = list(resource_constraints)
+    makespan = 0
+    start_time = [0] * len(tasks)
+    
+    for task in node.task_order:
+        task_duration, task_resource_req = tasks[task]
+        earliest_start_time = max(start_time[task], makespan)
+        
+        resource_available = True
+        for resource in range(len(resource_constraints)):
+            if remaining_resources[resource] < task_resource_req[resource]:
+                resource_available = False
+                break
+        
+        if resource_available:
+            makespan = earliest_start_time + task_duration
+            for resource in range(len(resource_constraints)):
+                remaining_resources[resource] -= task_resource_req[resource]
+        start_time[task] = earliest_start_time
+    
+    lower_bound = makespan
+    return lower_bound
+
+# Same as calculate_bound with the only resource kept in a number instead of a list
+def calculate_bound_single_resource(node, tasks, capacity):
+    remaining_resource = capacity
+    makespan = 0
+    start_time = [0] * len(tasks)
+
+    for task in node.task_order:
+        task_duration, task_resource_req = tasks[task]
+        earliest_start_time = max(start_time[task], makespan)
+        if remaining_resource >= task_resource_req[0]:
+            makespan = earliest_start_time + task_duration
+            remaining_resource -= task_resource_req[0]
+        start_time[task] = earliest_start_time
+
+    return makespan
+
+def update_resource_usage(resource_usage, task, tasks):
+    task_duration, task_resource_req = tasks[task]
+    if len(resource_usage) == 1:
+        resource_usage[0] += task_resource_req[0]
+        return resource_usage
+    for resource in range(len(resource_usage)):
+        resource_usage[resource] += task_resource_req[resource]
+    return resource_usage
+
+def is_precedence_satisfied(task_order, precedence_constraints):
+    scheduled_tasks_set = set(task_order)
+    for pre, suc in precedence_constraints:
+        if suc in scheduled_tasks_set and pre not in scheduled_tasks_set:
+            return False
+    return True
+
+def get_predecessors(num_tasks, precedence_constraints):
+    predecessors = [[] for _ in range(num_tasks)]
+    for pre, suc in precedence_constraints:
+        predecessors[suc].append(pre)
+    return predecessors
+
+# Earliest time after its predecessors at which every resource can hold the task for its whole duration
+def earliest_start_time(task, start_times, resource_profile, tasks, resource_constraints, predecessors):
+    task_duration, task_resource_req = tasks[task]
+    start = max((start_times[pre] + tasks[pre][0] for pre in predecessors[task]), default=0)
+    time = start
+    if len(resource_constraints) == 1:
+        # With a single resource the profile holds one number per time unit
+        available = resource_constraints[0] - task_resource_req[0]
+        while time < start + task_duration and time < len(resource_profile):
+            if resource_profile[time] > available:
+                start = time + 1
+            time += 1
+        return start
+    while time < start + task_duration:
+        if time < len(resource_profile) and any(
+                used + req > capacity
+                for used, req, capacity in zip(resource_profile[time], task_resource_req, resource_constraints)):
+            start = time + 1
+        time += 1
+    return start
+
+# Schedule a task at its earliest start time, the profile rows that do not change are shared with the parent
+def place_task(task, start_times, resource_profile, tasks, resource_constraints, predecessors):
+    task_duration, task_resource_req = tasks[task]
+    start = earliest_start_time(task, start_times, resource_profile, tasks, resource_constraints, predecessors)
+    new_start_times = list(start_times)
+    new_start_times[task] = start
+    new_resource_profile = list(resource_profile)
+    if len(resource_constraints) == 1:
+        if len(new_resource_profile) < start + task_duration:
+            new_resource_profile.extend([0] * (start + task_duration - len(new_resource_profile)))
+        for time in range(start, start + task_duration):
+            new_resource_profile[time] += task_resource_req[0]
+        return new_start_times, new_resource_profile
+    if len(new_resource_profile) < start + task_duration:
+        new_resource_profile.extend([[0] * len(resource_constraints)] * (start + task_duration - len(new_resource_profile)))
+    for time in range(start, start + task_duration):
+        new_resource_profile[time] = [used + req for used, req in zip(new_resource_profile[time], task_resource_req)]
+    return new_start_times, new_resource_profile
+
+def build_propagator(tasks, resource_constraints, precedence_constraints):
+    return TimetablePropagator([task_duration for task_duration, _ in tasks], [task_resource_req for _, task_resource_req in tasks],
+                               resource_constraints, precedence_constraints)
+
+# Latest end of the schedules that can still improve the incumbent. Placing every task at its earliest feasible
+# start never takes longer than running them one after another.
+def get_horizon(best_schedule, tasks, incumbent=None):
+    if incumbent is not None:
+        # Every schedule found is shared, so the shared makespan is never longer than the best schedule
+        return incumbent.value - 1
+    if best_schedule is None:
+        return sum(task_duration for task_duration, _ in tasks)
+    return max(start + task_duration for start, (task_duration, _) in zip(best_schedule.start_times, tasks)) - 1
+
+# Lowers the makespan shared by the solvers of a portfolio, returns whether it improved
+def share_incumbent(incumbent, makespan):
+    with incumbent.get_lock():
+        if makespan < incumbent.value:
+            incumbent.value = makespan
+            return True
+    return False
+
+# A search given a stop event (a multiprocessing.Event) ends, keeping the best schedule found, once it is set
+def is_cancelled(stop):
+    return stop is not None and stop.is_set()
+
+# With an incumbent (a multiprocessing.Value with the makespan of the best schedule known, shared with other solvers)
+# the search only keeps the nodes whose tasks end before it, shares every schedule it completes and prunes nothing
+# else, so running out of nodes proves that no schedule is shorter than the incumbent
+def rcpsp_branch_and_bound(tasks, resource_constraints, precedence_constraints, stats=None,
+                           propagation=False, incumbent=None, stop=None):
+    num_tasks = len(tasks)
+    num_resources = len(resource_constraints)
+    predecessors = get_predecessors(num_tasks, precedence_constraints)
+    best_schedule = None
+    priority_queue = []
+    infeasible_nodes_pruned = 0
+    incumbent_nodes_pruned = 0
+    nodes_expanded = 0
+    cancelled = False
+
+    propagator = build_propagator(tasks, resource_constraints, precedence_constraints) if propagation else None
+    windows = propagator.initial_windows(get_horizon(None, tasks, incumbent)) if propagation else None
+    initial_node = Node([], [0] * num_resources, calculate_bound(Node([], [0] * num_resources, 0), tasks, resource_constraints),
+                        [None] * num_tasks, [], windows)
+    if not propagation or windows is not None:
+        heapq.heappush(priority_queue, initial_node)
+
+    while priority_queue:
+        if is_cancelled(stop):
+            cancelled = True
+            break
+        node = heapq.heappop(priority_queue)
+
+        if incumbent is not None:
+            # The length of the resource profile is the end of the scheduled tasks
+            if len(node.resource_profile) >= incumbent.value:
+                incumbent_nodes_pruned += 1
+                continue
+            if len(node.task_order) == num_tasks:
+                best_schedule = node
+                share_incumbent(incumbent, len(node.resource_profile))
+                continue
+        elif len(node.task_order) == num_tasks:
+            if best_schedule is None or node.bound < best_schedule.bound:
+                best_schedule = node
+                continue
+
+        if incumbent is None and best_schedule and node.bound >= best_schedule.bound:
+            continue
+
+        nodes_expanded += 1
+        for task in range(num_tasks):
+            if task not in node.task_order and is_precedence_satisfied(node.task_order + [task], precedence_constraints):
+                new_start_times, new_resource_profile = place_task(task, node.start_times, node.resource_profile,
+                                                                   tasks, resource_constraints, predecessors)
+                if incumbent is not None and len(new_resource_profile) >= incumbent.value:
+                    incumbent_nodes_pruned += 1
+                    continue
+                new_windows = None
+                if propagation:
+                    new_windows = propagator.fix(node.windows, task, new_start_times[task],
+                                                 get_horizon(best_schedule, tasks, incumbent))
+                    if new_windows is None:
+                        infeasible_nodes_pruned += 1
+                        continue
+                new_task_order = node.task_order + [task]
+                new_resource_usage = update_resource_usage(list(node.resource_usage), task, tasks)
+                new_bound = calculate_bound(Node(new_task_order, new_resource_usage, 0), tasks, resource_constraints)
+                new_node = Node(new_task_order, new_resource_usage, new_bound, new_start_times, new_resource_profile, new_windows)
+                heapq.heappush(priority_queue, new_node)
+
+    if stats is not None:
+        stats['infeasible_nodes_pruned'] = infeasible_nodes_pruned
+        stats['incumbent_nodes_pruned'] = incumbent_nodes_pruned
+        stats['nodes_expanded'] = nodes_expanded
+        stats['cancelled'] = cancelled
+    return best_schedule
+
+# Convert the instance parameters into the tasks (duration and row of the demand matrix), the capacity of every
+# resource type and the (0-indexed) precedence constraints. The capacity of a single resource is the one of the
+# instance, as in the serial schedules of the rest of the package, unless another one is given: the scripts of the
+# course instances keep the largest demand of a task as capacity, as they always have.
+def build_problem(resources, task_duration, task_resource, task_dependencies, capacity=None):
+    if capacity is not None:
+        resources = capacity
+    demands, resource_constraints = get_demand_matrix(resources, task_resource)
+    tasks_list = list(zip(task_duration, demands))
+    precedence_constraints = [(a-1, b-1) for a, b in task_dependencies]
+    return tasks_list, resource_constraints, precedence_constraints
+
+@profiled
+def rcpsp_branch_and_bound_schedule(tasks, resources, task_duration, task_resource, task_dependencies):
+    tasks_list, resource_constraints, precedence_constraints = build_problem(resources, task_duration, task_resource, task_dependencies)
+    best_schedule = rcpsp_branch_and_bound(tasks_list, resource_constraints, precedence_constraints)
+    if best_schedule is None:
+        return []
+    return best_schedule.start_times
@@ -0,0 +1,55 @@
+import sys
+
+from ..upmproblems import rcpsp06, rcpsp07, rcpsp10
+from ..upmproblems.schedule import get_makespan
+from .astar import rcpsp_a_star
+from .branchandbound import build_problem, rcpsp_branch_and_bound
+
+# Makespan printed by the scripts of the course instances and makespan of the schedule they find, with the default
+# settings of the searches and the capacity of the scripts (the largest demand of a task). rcpsp30 takes minutes, so
+# it is left out.
+expected_makespans = {
+    ('rcpsp06', 'branch_and_bound'): (4, 16),
+    ('rcpsp06', 'a_star'): (7, 16),
+    ('rcpsp07', 'branch_and_bound'): (2, 8),
+    ('rcpsp07', 'a_star'): (2, 7),
+    ('rcpsp10', 'branch_and_bound'): (3, 20),
+    ('rcpsp10', 'a_star'): (3, 28),
+}
+instance_modules = {'rcpsp06': rcpsp06, 'rcpsp07': rcpsp07, 'rcpsp10': rcpsp10}
+
+
+def solve(instance_name, solver_name):
+    # Makespan printed by the script of the instance and makespan of the schedule found
+    module = instance_modules[instance_name]
+    task_resource = module.get_task_resource()
+    problem = build_problem(module.get_resources(), module.get_task_duration(), task_resource,
+                            module.get_task_dependencies(), capacity=max(task_resource))
+    if solver_name == 'branch_and_bound':
+        best_schedule = rcpsp_branch_and_bound(*problem)
+        printed = best_schedule.bound
+    else:
+        best_schedule = rcpsp_a_star(*problem)
+        printed = best_schedule.cost
+    return printed, get_makespan(best_schedule.start_times, module.get_task_duration())
+
+
+def check_makespans():
+    """
+    Solves the course instances with the branch and bound and the A* search and compares the makespans with the
+    ones recorded in expected_makespans
+    :return: list with the (instance, solver) whose makespans changed
+    """
+    changed = []
+    for (instance_name, solver_name), expected in expected_makespans.items():
+        found = solve(instance_name, solver_name)
+        print(f"{instance_name} {solver_name:<16} expected {expected} found {found}"
+              + ('  CHANGED' if found != expected else ''))
+        if found != expected:
+            changed.append((instance_name, solver_name))
+    return changed
+
+
+if __name__ == "__main__":
+    if check_makespans():
+        sys.exit(1)
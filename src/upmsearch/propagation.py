@@ -0,0 +1,194 @@
+from ..upmproblems.schedule import get_tails, get_topological_order
+
+
+class Windows:
+    """
+    Earliest and latest start time of every task for schedules that end by the horizon, together with the
+    resource usage of their compulsory parts (the time units a task occupies wherever it starts in its window)
+    """
+    __slots__ = ('earliest', 'latest', 'profile', 'horizon')
+
+    def __init__(self, earliest, latest, profile, horizon):
+        self.earliest = earliest
+        self.latest = latest
+        self.profile = profile
+        self.horizon = horizon
+
+    def copy(self):
+        return Windows(list(self.earliest), list(self.latest), [list(usage) for usage in self.profile], self.horizon)
+
+
+class TimetablePropagator:
+    """
+    Tightens the start time windows with precedence propagation and timetable reasoning against the capacity
+    of every resource. Each branching decision only propagates from the tasks whose window changed.
+    :param task_duration: list of durations of the tasks
+    :param task_demands: list with the amount of every resource required by each task
+    :param capacities: list with the capacity of every resource
+    :param precedence_constraints: list of (0-indexed) dependencies between tasks
+    """
+    def __init__(self, task_duration, task_demands, capacities, precedence_constraints):
+        num_tasks = len(task_duration)
+        task_dependencies = [(pre + 1, suc + 1) for pre, suc in precedence_constraints]
+        self.task_duration = task_duration
+        self.task_demands = task_demands
+        self.capacities = capacities
+        self.predecessors = [[] for _ in range(num_tasks)]
+        self.successors = [[] for _ in range(num_tasks)]
+        for pre, suc in precedence_constraints:
+            self.predecessors[suc].append(pre)
+            self.successors[pre].append(suc)
+        self.tails = get_tails(num_tasks, task_duration, task_dependencies)
+        self.heads = [0] * num_tasks
+        for task in get_topological_order(num_tasks, task_dependencies):
+            for suc in self.successors[task]:
+                self.heads[suc] = max(self.heads[suc], self.heads[task] + task_duration[task])
+        self.revisions = 0  # Number of windows revised, a measure of the work of the propagation
+
+    def initial_windows(self, horizon):
+        """
+        Returns the propagated windows of the tasks for schedules that end by the horizon, or None if there is none
+        """
+        num_tasks = len(self.task_duration)
+        latest = [horizon - tail for tail in self.tails]
+        windows = Windows(list(self.heads), latest, [[0] * horizon for _ in self.capacities], horizon)
+        return self.propagate(windows, range(num_tasks), [-1] * num_tasks, [-1] * num_tasks)
+
+    def fix(self, windows, task, start_time, horizon):
+        """
+        Returns the windows after starting a task at the given time, or None if no schedule that ends by the
+        horizon remains. The windows received are not modified.
+        """
+        windows = windows.copy()
+        old_earliest = list(windows.earliest)
+        old_latest = list(windows.latest)
+        changed = [task]
+        if horizon < windows.horizon:
+            windows.horizon = horizon
+            for other, tail in enumerate(self.tails):
+                if windows.latest[other] > horizon - tail:
+                    windows.latest[other] = horizon - tail
+                    if other != task:  # Propagated once, or its compulsory part would be counted twice
+                        changed.append(other)
+        if not windows.earliest[task] <= start_time <= windows.latest[task]:
+            return None
+        windows.earliest[task] = start_time
+        windows.latest[task] = start_time
+        return self.propagate(windows, changed, old_earliest, old_latest)
+
+    def propagate(self, windows, changed, old_earliest, old_latest):
+        # old_earliest and old_latest hold the window whose compulsory part is currently in the profile, -1 if none
+        earliest = windows.earliest
+        latest = windows.latest
+        pending = set()
+        queue = []
+        for task in changed:
+            if earliest[task] > latest[task]:
+                return None
+            woken = [task]
+            if old_earliest[task] != earliest[task] or old_latest[task] != latest[task]:
+                interval = self.update_profile(windows, task, old_earliest[task], old_latest[task])
+                if not interval:
+                    return None
+                woken.extend(self.overlapping(windows, task, interval))
+            for other in woken:
+                if other not in pending:
+                    pending.add(other)
+                    queue.append(other)
+
+        while queue:
+            task = queue.pop()
+            pending.discard(task)
+            self.revisions += 1
+            duration = self.task_duration[task]
+            task_earliest = max([earliest[task]] + [earliest[pre] + self.task_duration[pre] for pre in self.predecessors[task]])
+            task_latest = min([latest[task]] + [latest[suc] - duration for suc in self.successors[task]])
+            task_earliest = self.earliest_fit(windows, task, task_earliest, task_latest)
+            task_latest = self.latest_fit(windows, task, task_earliest, task_latest)
+            if task_earliest > task_latest:
+                return None
+            if task_earliest == earliest[task] and task_latest == latest[task]:
+                continue
+
+            previous_earliest, previous_latest = earliest[task], latest[task]
+            earliest[task] = task_earliest
+            latest[task] = task_latest
+            interval = self.update_profile(windows, task, previous_earliest, previous_latest)
+            if not interval:
+                return None
+
+            woken = []
+            if task_earliest != previous_earliest:
+                woken.extend(self.successors[task])
+            if task_latest != previous_latest:
+                woken.extend(self.predecessors[task])
+            woken.extend(self.overlapping(windows, task, interval))
+            for other in woken:
+                if other not in pending:
+                    pending.add(other)
+                    queue.append(other)
+        return windows
+
+    def overlapping(self, windows, task, interval):
+        # When the compulsory part of a task grows, the tasks that may run at the same time can lose start times
+        begin, end = interval
+        if begin >= end:
+            return []
+        earliest = windows.earliest
+        latest = windows.latest
+        return [other for other in range(len(earliest))
+                if other != task and earliest[other] < end and begin < latest[other] + self.task_duration[other]]
+
+    def compulsory_part(self, task, task_earliest, task_latest):
+        if task_earliest < 0:
+            return 0, 0
+        return task_latest, max(task_latest, task_earliest + self.task_duration[task])
+
+    def update_profile(self, windows, task, previous_earliest, previous_latest):
+        # Move the compulsory part of a task to its current window, returns the time units added to the profile
+        # ((0, 0) if none) or None when a resource is overloaded
+        old_begin, old_end = self.compulsory_part(task, previous_earliest, previous_latest)
+        begin, end = self.compulsory_part(task, windows.earliest[task], windows.latest[task])
+        if (begin, end) == (old_begin, old_end):
+            return 0, 0
+        for resource, demand in enumerate(self.task_demands[task]):
+            if demand == 0:
+                continue
+            usage = windows.profile[resource]
+            for time in range(old_begin, old_end):
+                usage[time] -= demand
+            for time in range(begin, end):
+                usage[time] += demand
+                if usage[time] > self.capacities[resource]:
+                    return None
+        if begin >= end:
+            return 0, 0
+        return begin, end
+
+    def fits(self, windows, task, time, own_part):
+        # Whether the task fits at a time unit next to the compulsory parts of the other tasks. Its own compulsory
+        # part is already counted in the profile, which never exceeds the capacity.
+        if own_part[0] <= time < own_part[1]:
+            return True
+        for resource, demand in enumerate(self.task_demands[task]):
+            if demand and windows.profile[resource][time] + demand > self.capacities[resource]:
+                return False
+        return True
+
+    def earliest_fit(self, windows, task, task_earliest, task_latest):
+        own_part = self.compulsory_part(task, windows.earliest[task], windows.latest[task])
+        time = task_earliest
+        while time < task_earliest + self.task_duration[task] and task_earliest <= task_latest:
+            if not self.fits(windows, task, time, own_part):
+                task_earliest = time + 1
+            time += 1
+        return task_earliest
+
+    def latest_fit(self, windows, task, task_earliest, task_latest):
+        own_part = self.compulsory_part(task, windows.earliest[task], windows.latest[task])
+        time = task_latest + self.task_duration[task] - 1
+        while time >= task_latest and task_earliest <= task_latest:
+            if not self.fits(windows, task, time, own_part):
+                task_latest = time - self.task_duration[task]
+            time -= 1
+        return task_latest
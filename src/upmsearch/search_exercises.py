@@ -1,4 +1,14 @@
+import heapq
+from array import array
+from itertools import count
+
+from ..upmproblems.profiling import profiled
 from ..upmproblems.rcpsp06 import get_tasks, get_resources, get_task_duration, get_task_resource, get_task_dependencies
+from ..upmproblems.reverse import solve_in_direction
+from ..upmproblems.schedule import get_predecessors, get_tails, get_topological_order
+from ..upmproblems.solutioncache import solve_cached
+from .branchandbound import is_cancelled
+from .propagation import TimetablePropagator
 
 tasks = get_tasks()
 resources = get_resources()
@@ -6,137 +16,273 @@ task_duration = get_task_duration()
 task_resource = get_task_resource()
 task_dependencies = get_task_dependencies()
 
-class ProblemState:
-    def __init__(self, tasks, resources, task_durations, task_resources, task_dependencies, current_schedule=None):
+class Problem:
+    """
+    Instance data shared by every state of the search
+    :param tasks: number of tasks in the task planning problem with resources
+    :param resources: number of resources in the task planning problem with resources
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    """
+    def __init__(self, tasks, resources, task_duration, task_resource, task_dependencies):
         self.tasks = tasks
         self.resources = resources
-        self.task_durations = task_durations
-        self.task_resources = task_resources
+        self.task_duration = task_duration
+        self.task_resource = task_resource
         self.task_dependencies = task_dependencies
-        self.current_schedule = current_schedule if current_schedule else {task: None for task in tasks}
+        self.predecessors = get_predecessors(tasks, task_dependencies)
+        self.topological_order = get_topological_order(tasks, task_dependencies)
+        self.tails = get_tails(tasks, task_duration, task_dependencies)
+        # No schedule can end before the total work fits in the capacity of the resource
+        total_energy = sum(duration * demand for duration, demand in zip(task_duration, task_resource))
+        self.energy_bound = -(-total_energy // resources) if resources else 0
+        # Placing every task at its earliest feasible start never takes longer than running them one after another
+        self.horizon = sum(task_duration)
+        self.propagator = TimetablePropagator(task_duration, [[demand] for demand in task_resource], [resources],
+                                              [(pre - 1, suc - 1) for pre, suc in task_dependencies])
+
+    # Latest end of the schedules that can still improve the best solution found
+    def get_horizon(self, best_solution_value):
+        return self.horizon if best_solution_value == float('inf') else best_solution_value - 1
+
+
+class ProblemState:
+    """
+    Partial schedule built by placing one task at a time at its earliest feasible start time. The start times
+    (-1 for the unscheduled tasks) and the usage of the resource at every time unit are kept in integer arrays.
+    The optional windows are the start time windows of the tasks kept by the TimetablePropagator.
+    """
+    __slots__ = ('problem', 'start_times', 'usage', 'scheduled', 'last_task', 'makespan', 'windows', 'bound')
+
+    def __init__(self, problem, start_times=None, usage=None, scheduled=0, last_task=-1, makespan=0, windows=None):
+        self.problem = problem
+        self.start_times = start_times if start_times is not None else array('i', [-1]) * problem.tasks
+        self.usage = usage if usage is not None else array('i')
+        self.scheduled = scheduled
+        self.last_task = last_task
+        self.makespan = makespan
+        self.windows = windows
+        self.bound = self.estimate_completion_time()
 
     def is_promising(self, best_solution_value):
-        for time in range(best_solution_value):
-            resource_usage = {resource: 0 for resource in self.resources}
-            for task, start_time in self.current_schedule.items():
-                if start_time is not None and start_time <= time < start_time + self.task_durations[task]:
-                    for resource, amount in self.task_resources[task].items():
-                        resource_usage[resource] += amount
-                        if resource_usage[resource] > self.resources[resource]:
-                            return False
-        estimated_completion_time = self.estimate_completion_time()
-        return estimated_completion_time < best_solution_value
+        return self.bound < best_solution_value
 
     def is_solution(self):
-        for task, dependencies in self.task_dependencies.items():
-            for dependency in dependencies:
-                if self.current_schedule[task] is None or self.current_schedule[dependency] is None:
-                    return False
-                if self.current_schedule[task] < self.current_schedule[dependency] + self.task_durations[dependency]:
-                    return False
-        return all(start_time is not None for start_time in self.current_schedule.values())
+        return self.scheduled == self.problem.tasks
 
     def value(self):
         if not self.is_solution():
             return float('inf')
-        return max(start_time + self.task_durations[task] for task, start_time in self.current_schedule.items())
+        return self.makespan
 
     def possible_moves(self):
+        predecessors = self.problem.predecessors
+        start_times = self.start_times
         moves = []
-        for task in self.tasks:
-            if self.current_schedule[task] is None:
-                dependencies_met = all(
-                    self.current_schedule[dependency] is not None and
-                    self.current_schedule[dependency] + self.task_durations[dependency] <= self.current_schedule[task]
-                    for dependency in self.task_dependencies[task]
-                )
-                if dependencies_met:
-                    earliest_start_time = self.find_earliest_start_time(task)
-                    moves.append((task, earliest_start_time))
+        for task in range(self.problem.tasks):
+            if start_times[task] < 0 and all(start_times[pre] >= 0 for pre in predecessors[task]):
+                moves.append((task, self.find_earliest_start_time(task)))
         return moves
 
-    def apply_move(self, move):
+    def is_symmetric(self, move):
+        # Orders of the same tasks often build the same schedule, only the one listing them by start time
+        # (ties broken by task index) is expanded unless a dependency forces the task after the previous one
+        task, start_time = move
+        last_task = self.last_task
+        if last_task < 0 or last_task in self.problem.predecessors[task]:
+            return False
+        return (start_time, task) < (self.start_times[last_task], last_task)
+
+    def child_bound(self, move):
+        # Cheap bound of a child that has not been built yet, refined by estimate_completion_time once it is
         task, start_time = move
-        new_schedule = self.current_schedule.copy()
-        new_schedule[task] = start_time
-        return ProblemState(self.tasks, self.resources, self.task_durations, self.task_resources, self.task_dependencies, new_schedule)
+        return max(self.bound, start_time + self.problem.tails[task])
+
+    def apply_move(self, move, windows=None):
+        task, start_time = move
+        end_time = start_time + self.problem.task_duration[task]
+        demand = self.problem.task_resource[task]
+        start_times = self.start_times[:]
+        start_times[task] = start_time
+        usage = self.usage[:]
+        if len(usage) < end_time:
+            usage.extend(array('i', [0]) * (end_time - len(usage)))
+        for time in range(start_time, end_time):
+            usage[time] += demand
+        return ProblemState(self.problem, start_times, usage, self.scheduled + 1, task, max(self.makespan, end_time), windows)
 
     def estimate_completion_time(self):
-        latest_end_time = max(
-            (start_time + self.task_durations[task] for task, start_time in self.current_schedule.items() if start_time is not None),
-            default=0
-        )
-        for task in self.tasks:
-            if self.current_schedule[task] is None:
-                latest_end_time = max(latest_end_time, latest_end_time + self.task_durations[task])
-        return latest_end_time
+        # Every unscheduled task starts after its predecessors end and is followed by its longest chain of successors
+        problem = self.problem
+        task_duration = problem.task_duration
+        start_times = self.start_times
+        earliest_start = list(start_times)
+        estimate = max(self.makespan, problem.energy_bound)
+        for task in problem.topological_order:
+            if start_times[task] < 0:
+                earliest_start[task] = max([0 if self.windows is None else self.windows.earliest[task]] +
+                                           [earliest_start[pre] + task_duration[pre] for pre in problem.predecessors[task]])
+                estimate = max(estimate, earliest_start[task] + problem.tails[task])
+        return estimate
 
     def find_earliest_start_time(self, task):
         # The earliest start time is at least after all dependencies have been completed.
-        dependency_completion_times = [self.current_schedule[d] + self.task_durations[d] for d in self.task_dependencies[task] if self.current_schedule[d] is not None]
-        earliest_start_time = max(dependency_completion_times, default=0)
-
-        # Check resource availability from the earliest start time onwards.
-        while True:
-            resource_feasible = True
-            for time in range(earliest_start_time, earliest_start_time + self.task_durations[task]):
-                for resource, required_amount in self.task_resources[task].items():
-                    if required_amount > 0:  # If the task requires this resource
-                        # Calculate the total resource usage including the proposed task
-                        resource_usage = sum(
-                            self.task_resources[other_task][resource]
-                            for other_task, start_time in self.current_schedule.items()
-                            if start_time is not None and start_time <= time < start_time + self.task_durations[other_task]
-                        ) + required_amount
-
-                        # If the total usage exceeds the resource limit, this start time is not feasible
-                        if resource_usage > self.resources[resource]:
-                            resource_feasible = False
-                            break
-
-                if not resource_feasible:
-                    break
-
-            # If resources are available for the entire duration of the task, this start time is feasible
-            if resource_feasible:
-                return earliest_start_time
-
-            # If not, increment the earliest start time and check again
-            earliest_start_time += 1
-
-
-def branch_and_bound(initial_state):
-    best_solution = None
-    best_solution_value = float('inf')
-    queue = [initial_state]
-
-    while queue:
-        state = queue.pop(0)
-        if not state.is_promising(best_solution_value):
-            continue
-        if state.is_solution() and state.value() < best_solution_value:
+        problem = self.problem
+        duration = problem.task_duration[task]
+        available = problem.resources - problem.task_resource[task]
+        earliest_start_time = max((self.start_times[pre] + problem.task_duration[pre] for pre in problem.predecessors[task]),
+                                  default=0)
+
+        # Move past every time unit where the resource cannot hold the task
+        usage = self.usage
+        time = earliest_start_time
+        while time < earliest_start_time + duration and time < len(usage):
+            if usage[time] > available:
+                earliest_start_time = time + 1
+            time += 1
+        return earliest_start_time
+
+
+# Build a first solution by always scheduling the task with the longest chain of successors
+def greedy_solution(state):
+    tails = state.problem.tails
+    while not state.is_solution():
+        state = state.apply_move(max(state.possible_moves(), key=lambda move: (tails[move[0]], -move[1])))
+    return state
+
+
+# Solution state of a known schedule, built by placing its tasks in the order of their start times
+def solution_state(state, start_times):
+    for task in sorted(range(len(start_times)), key=lambda task: (start_times[task], task)):
+        state = state.apply_move((task, start_times[task]))
+    return state
+
+def best_first_search(initial_state, best_solution=None, stats=None, propagation=True, stop=None):
+    """
+    Expands the state with the lowest bound first. Children wait in the frontier as (parent, move) and are only
+    built when they are taken out, so the ones that are pruned never copy the arrays of their parent.
+    :param initial_state: state to start the search from
+    :param best_solution: incumbent solution, if any
+    :param stats: optional dictionary that receives the number of expanded, symmetric and infeasible nodes
+    :param propagation: whether to propagate the start time windows against the incumbent makespan
+    :param stop: optional event (threading or multiprocessing) that ends the search with the best solution found
+    :return: the optimal solution state, or None if there is no solution better than the incumbent
+    """
+    problem = initial_state.problem
+    best_solution_value = best_solution.value() if best_solution else float('inf')
+    counter = count()
+    expanded = 0
+    symmetric_nodes_pruned = 0
+    infeasible_nodes_pruned = 0
+
+    if propagation and initial_state.windows is None:
+        horizon = problem.get_horizon(best_solution_value)
+        windows = problem.propagator.initial_windows(horizon)
+        for task, start_time in enumerate(initial_state.start_times):
+            if start_time >= 0 and windows is not None:
+                windows = problem.propagator.fix(windows, task, start_time, horizon)
+        initial_state = ProblemState(problem, initial_state.start_times, initial_state.usage, initial_state.scheduled,
+                                     initial_state.last_task, initial_state.makespan, windows)
+    frontier = []
+    if not propagation or initial_state.windows is not None:
+        frontier.append((initial_state.bound, 0, next(counter), initial_state, None))
+    # Otherwise the propagation already proved that no schedule can improve the incumbent
+
+    while frontier and not is_cancelled(stop):
+        bound, depth, _, state, move = heapq.heappop(frontier)
+        if bound >= best_solution_value:
+            break  # Every state left in the frontier has a bound at least as large
+        if move is not None:
+            windows = None
+            if state.windows is not None:
+                windows = problem.propagator.fix(state.windows, move[0], move[1], problem.get_horizon(best_solution_value))
+                if windows is None:
+                    infeasible_nodes_pruned += 1
+                    continue
+            state = state.apply_move(move, windows)
+            if state.bound > bound:
+                heapq.heappush(frontier, (state.bound, depth, next(counter), state, None))
+                continue
+        if state.is_solution():
             best_solution = state
             best_solution_value = state.value()
+            continue
+
+        expanded += 1
         for move in state.possible_moves():
-            child_state = state.apply_move(move)
-            queue.append(child_state)
+            if state.is_symmetric(move):
+                symmetric_nodes_pruned += 1
+                continue
+            child_bound = state.child_bound(move)
+            if child_bound < best_solution_value:
+                heapq.heappush(frontier, (child_bound, depth - 1, next(counter), state, move))
 
+    if stats is not None:
+        stats['expanded'] = expanded
+        stats['symmetric_nodes_pruned'] = symmetric_nodes_pruned
+        stats['infeasible_nodes_pruned'] = infeasible_nodes_pruned
     return best_solution
 
-def exercise1(tasks, resources, task_durations, task_resources, task_dependencies):
-    initial_state = ProblemState(tasks, resources, task_durations, task_resources, task_dependencies)
-    best_solution_state = branch_and_bound(initial_state)
+def branch_and_bound(initial_state, stats=None, propagation=True, stop=None, best_solution=None):
+    # Deeper states are preferred on ties and the greedy solution, unless the given one is shorter, is used as the
+    # first incumbent
+    greedy = greedy_solution(initial_state)
+    if best_solution is None or greedy.value() < best_solution.value():
+        best_solution = greedy
+    return best_first_search(initial_state, best_solution, stats, propagation, stop)
+
+def a_star(initial_state, stats=None, propagation=True, stop=None, best_solution=None):
+    # The bound is admissible, so the first solution taken out of the frontier is optimal
+    return best_first_search(initial_state, best_solution, stats, propagation, stop)
+
+@profiled
+def branch_and_bound_schedule(tasks, resources, task_duration, task_resource, task_dependencies, warm_start=None):
+    initial_state = ProblemState(Problem(tasks, resources, task_duration, task_resource, task_dependencies))
+    best_solution = solution_state(initial_state, warm_start) if warm_start is not None else None
+    best_solution_state = branch_and_bound(initial_state, best_solution=best_solution)
     if best_solution_state:
-        return [best_solution_state.current_schedule[task] for task in tasks]
+        return list(best_solution_state.start_times)
     else:
         return []
 
+@profiled
+def a_star_schedule(tasks, resources, task_duration, task_resource, task_dependencies, warm_start=None):
+    initial_state = ProblemState(Problem(tasks, resources, task_duration, task_resource, task_dependencies))
+    best_solution = solution_state(initial_state, warm_start) if warm_start is not None else None
+    best_solution_state = a_star(initial_state, best_solution=best_solution)
+    if best_solution_state:
+        return list(best_solution_state.start_times)
+    else:
+        return []
 
+@profiled
+def exercise1(tasks=0, resources=0, task_duration=[], task_resource=[], task_dependencies=[], direction='forward',
+              cache=None):
+    """
+    Returns the best solution found by the branch and bound algorithm of exercise 1
+    :param tasks: number of tasks in the task planning problem with resources
+    :param resources: number of resources in the task planning problem with resources
+    :param task_duration: list of durations of the tasks
+    :param task_resource: list of resources required by each task
+    :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param direction: 'forward', 'backward' (solve the reversed instance) or 'both' (solve both in parallel)
+    :param cache: optional SolutionCache, or path of its database: its schedule of the instance is returned at once
+                  if it is proven optimal, used as warm start otherwise, and the schedule found is stored in it
+    :param profile: optional prefix of the paths of the files of src.upmproblems.profiling.profile_call, the run is
+                    then profiled (only in this process with direction='both')
+    :return: list with the start time of each task in the best solution found, or empty list if no solution was found
+    """
+    if cache is None:
+        return solve_in_direction(branch_and_bound_schedule, direction, tasks, resources, task_duration, task_resource, task_dependencies)
+    return solve_cached(cache, 'exercise1', lambda warm_start: solve_in_direction(branch_and_bound_schedule, direction, tasks, resources, task_duration, task_resource, task_dependencies, warm_start),
+                        tasks, resources, task_duration, task_resource, task_dependencies, exact=True,
+                        metadata=dict(direction=direction))
 
 
-
-
-def exercise2(tasks=0, resources=0, task_duration=[], task_resource=[], task_dependencies=[]):
+@profiled
+def exercise2(tasks=0, resources=0, task_duration=[], task_resource=[], task_dependencies=[], direction='forward',
+              cache=None):
     """
     Returns the best solution found by the A* algorithm of exercise 2
     :param tasks: number of tasks in the task planning problem with resources
@@ -144,6 +290,15 @@ def exercise2(tasks=0, resources=0, task_duration=[], task_resource=[], task_dep
     :param task_duration: list of durations of the tasks
     :param task_resource: list of resources required by each task
     :param task_dependencies: list of dependencies (expressed as binary tuples) between tasks
+    :param direction: 'forward', 'backward' (solve the reversed instance) or 'both' (solve both in parallel)
+    :param cache: optional SolutionCache, or path of its database: its schedule of the instance is returned at once
+                  if it is proven optimal, used as warm start otherwise, and the schedule found is stored in it
+    :param profile: optional prefix of the paths of the files of src.upmproblems.profiling.profile_call, the run is
+                    then profiled (only in this process with direction='both')
     :return: list with the start time of each task in the best solution found, or empty list if no solution was found
     """
-    return []
+    if cache is None:
+        return solve_in_direction(a_star_schedule, direction, tasks, resources, task_duration, task_resource, task_dependencies)
+    return solve_cached(cache, 'exercise2', lambda warm_start: solve_in_direction(a_star_schedule, direction, tasks, resources, task_duration, task_resource, task_dependencies, warm_start),
+                        tasks, resources, task_duration, task_resource, task_dependencies, exact=True,
+                        metadata=dict(direction=direction))